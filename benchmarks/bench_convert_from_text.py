@@ -0,0 +1,79 @@
+"""
+Compare the span based convert_from_text against the previous
+``text.replace`` per link implementation on link-heavy messages.
+
+Run with ``python benchmarks/bench_convert_from_text.py``. No network is used,
+links are "shortened" by an in-process backend.
+"""
+import asyncio
+import os
+import random
+import string
+import sys
+import time
+
+# The checkout's shortzy, without installing it.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from shortzy.adlinkfly import Adlinkfly  # noqa: E402
+from shortzy.extractor import extract_urls  # noqa: E402
+
+
+class OfflineShortener(Adlinkfly):
+    async def _shorten(self, link: str, alias: str = "", silently_fail: bool = False) -> str:
+        return "https://droplink.co/" + format(hash(link) & 0xFFFFFF, "x")
+
+
+async def legacy_convert_from_text(shortener, text: str) -> str:
+    links = extract_urls(text)
+    shortened_links = await shortener.bulk_convert(links)
+    for i, short_link in enumerate(shortened_links):
+        text = text.replace(links[i], short_link)
+    return text
+
+
+def make_text(length: int, links: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    urls = [
+        "https://example.com/{}?id={}".format(
+            "".join(rng.choices(string.ascii_lowercase, k=8)), rng.randint(0, 10**6)
+        )
+        for _ in range(links)
+    ]
+    filler = max(length - sum(len(url) + 2 for url in urls), links)
+    words = "".join(rng.choices(string.ascii_letters + "      ", k=filler))
+    chunk = max(filler // links, 1)
+    parts = []
+    for i, url in enumerate(urls):
+        parts.append(words[i * chunk:(i + 1) * chunk])
+        parts.append(" " + url + " ")
+    return "".join(parts)
+
+
+async def run(fn, shortener, text: str, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        await fn(shortener, text)
+    return (time.perf_counter() - start) / repeat
+
+
+async def main():
+    shortener = OfflineShortener("benchmark")
+
+    async def current(shortener, text):
+        return await shortener.convert_from_text(text)
+
+    print(f"{'chars':>8} {'links':>6} {'legacy ms':>10} {'span ms':>10} {'speedup':>8}")
+    for length, links, repeat in [(4096, 100, 200), (4096, 200, 100), (65536, 1000, 20)]:
+        text = make_text(length, links)
+        legacy = await run(legacy_convert_from_text, shortener, text, repeat)
+        span = await run(current, shortener, text, repeat)
+        print(
+            f"{len(text):>8} {links:>6} {legacy * 1000:>10.3f} {span * 1000:>10.3f} "
+            f"{legacy / span:>7.2f}x"
+        )
+    await shortener.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,112 @@
+"""
+Compare the shared URL extractor against the regex previously inlined in
+every backend. The results are checked for equality on a generated corpus
+before throughput (MB/s) is measured.
+
+Run with ``python benchmarks/bench_extractor.py``.
+"""
+import os
+import random
+import re
+import string
+import sys
+import time
+
+# The checkout's shortzy, without installing it.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from shortzy.extractor import extract_url_spans  # noqa: E402
+
+LEGACY_REGEX = r"""(?i)\b((?:https?:(?:/{1,3}|[a-z0-9%])|[a-z0-9.\-]+[.](?:com|net|org|edu|gov|mil|aero|asia|biz|cat|coop|info|int|jobs|mobi|museum|name|post|pro|tel|travel|xxx|ac|ad|ae|af|ag|ai|al|am|an|ao|aq|ar|as|at|au|aw|ax|az|ba|bb|bd|be|bf|bg|bh|bi|bj|bm|bn|bo|br|bs|bt|bv|bw|by|bz|ca|cc|cd|cf|cg|ch|ci|ck|cl|cm|cn|co|cr|cs|cu|cv|cx|cy|cz|dd|de|dj|dk|dm|do|dz|ec|ee|eg|eh|er|es|et|eu|fi|fj|fk|fm|fo|fr|ga|gb|gd|ge|gf|gg|gh|gi|gl|gm|gn|gp|gq|gr|gs|gt|gu|gw|gy|hk|hm|hn|hr|ht|hu|id|ie|il|im|in|io|iq|ir|is|it|je|jm|jo|jp|ke|kg|kh|ki|km|kn|kp|kr|kw|ky|kz|la|lb|lc|li|lk|lr|ls|lt|lu|lv|ly|ma|mc|md|me|mg|mh|mk|ml|mm|mn|mo|mp|mq|mr|ms|mt|mu|mv|mw|mx|my|mz|na|nc|ne|nf|ng|ni|nl|no|np|nr|nu|nz|om|pa|pe|pf|pg|ph|pk|pl|pm|pn|pr|ps|pt|pw|py|qa|re|ro|rs|ru|rw|sa|sb|sc|sd|se|sg|sh|si|sj|Ja|sk|sl|sm|sn|so|sr|ss|st|su|sv|sx|sy|sz|tc|td|tf|tg|th|tj|tk|tl|tm|tn|to|tp|tr|tt|tv|tw|tz|ua|ug|uk|us|uy|uz|va|vc|ve|vg|vi|vn|vu|wf|ws|ye|yt|yu|za|zm|zw)/)(?:[^\s()<>{}\[\]]+|\([^\s()]*?\([^\s()]+\)[^\s()]*?\)|\([^\s]+?\))+(?:\([^\s()]*?\([^\s()]+\)[^\s()]*?\)|\([^\s]+?\)|[^\s`!()\[\]{};:'".,<>?«»“”‘’])|(?:(?<!@)[a-z0-9]+(?:[.\-][a-z0-9]+)*[.](?:com|net|org|edu|gov|mil|aero|asia|biz|cat|coop|info|int|jobs|mobi|museum|name|post|pro|tel|travel|xxx|ac|ad|ae|af|ag|ai|al|am|an|ao|aq|ar|as|at|au|aw|ax|az|ba|bb|bd|be|bf|bg|bh|bi|bj|bm|bn|bo|br|bs|bt|bv|bw|by|bz|ca|cc|cd|cf|cg|ch|ci|ck|cl|cm|cn|co|cr|cs|cu|cv|cx|cy|cz|dd|de|dj|dk|dm|do|dz|ec|ee|eg|eh|er|es|et|eu|fi|fj|fk|fm|fo|fr|ga|gb|gd|ge|gf|gg|gh|gi|gl|gm|gn|gp|gq|gr|gs|gt|gu|gw|gy|hk|hm|hn|hr|ht|hu|id|ie|il|im|in|io|iq|ir|is|it|je|jm|jo|jp|ke|kg|kh|ki|km|kn|kp|kr|kw|ky|kz|la|lb|lc|li|lk|lr|ls|lt|lu|lv|ly|ma|mc|md|me|mg|mh|mk|ml|mm|mn|mo|mp|mq|mr|ms|mt|mu|mv|mw|mx|my|mz|na|nc|ne|nf|ng|ni|nl|no|np|nr|nu|nz|om|pa|pe|pf|pg|ph|pk|pl|pm|pn|pr|ps|pt|pw|py|qa|re|ro|rs|ru|rw|sa|sb|sc|sd|se|sg|sh|si|sj|Ja|sk|sl|sm|sn|so|sr|ss|st|su|sv|sx|sy|sz|tc|td|tf|tg|th|tj|tk|tl|tm|tn|to|tp|tr|tt|tv|tw|tz|ua|ug|uk|us|uy|uz|va|vc|ve|vg|vi|vn|vu|wf|ws|ye|yt|yu|za|zm|zw)\b/?(?!@)))"""
+
+SAMPLES = [
+    "https://example.com/watch?v=d8RLHL3Lizw",
+    "http://a.b/c(d)",
+    "www.google.com",
+    "foo.com.zzz",
+    "a@b.com",
+    "x.co1",
+    "http:ab",
+    "(https://ex.com/a_(b))",
+    "google.com/",
+    "mail.me@x.in",
+    "1.2.3.4",
+    "e.g.",
+    "«https://x.io/»",
+    "a-b.c-d.org.",
+    "https://t.me/joinchat/xyz?start=1&a=b.",
+    "sub.domain.CO.uk/x",
+    "x@foo.com/bar",
+]
+
+
+def legacy_extract_url_spans(text: str) -> list:
+    return [match.span(1) for match in re.finditer(LEGACY_REGEX, text)]
+
+
+def make_corpus(count: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    alphabet = string.ascii_letters + string.digits + " .:/-@()[]{}<>?&=%_,;'\"\n\t«»"
+    corpus = []
+    for _ in range(count):
+        parts = []
+        for _ in range(rng.randint(1, 12)):
+            roll = rng.random()
+            if roll < 0.3:
+                parts.append(rng.choice(SAMPLES))
+            elif roll < 0.6:
+                parts.append("".join(rng.choices(alphabet, k=rng.randint(1, 20))))
+            else:
+                parts.append(rng.choice([" ", "\n", " ", ""]))
+        corpus.append("".join(parts))
+    return corpus
+
+
+def make_message(size: int, links_per_kb: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    words = [
+        "".join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 9)))
+        for _ in range(500)
+    ]
+    parts = []
+    length = 0
+    while length < size:
+        if rng.random() < links_per_kb / 150:
+            part = rng.choice(SAMPLES[:3] + ["https://droplink.co/st?api=x&url=y"])
+        else:
+            part = rng.choice(words) + rng.choice([" ", " ", ", ", ". ", "\n"])
+        parts.append(part + " ")
+        length += len(part) + 1
+    return "".join(parts)
+
+
+def throughput(fn, text: str, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(text)
+    elapsed = time.perf_counter() - start
+    return len(text.encode()) * repeat / elapsed / 1e6
+
+
+def main():
+    corpus = make_corpus(5000)
+    mismatches = sum(
+        legacy_extract_url_spans(text) != extract_url_spans(text) for text in corpus
+    )
+    print(f"corpus: {len(corpus)} texts, {mismatches} mismatches")
+    if mismatches:
+        raise SystemExit(1)
+
+    print(f"{'scenario':<24} {'legacy MB/s':>12} {'shared MB/s':>12} {'speedup':>8}")
+    for name, text, repeat in [
+        ("4 KiB caption", make_message(4096, 25), 200),
+        ("1 MiB chat log", make_message(2**20, 5), 3),
+        ("1 MiB prose, no links", make_message(2**20, 0), 3),
+    ]:
+        legacy = throughput(legacy_extract_url_spans, text, repeat)
+        shared = throughput(extract_url_spans, text, repeat)
+        print(f"{name:<24} {legacy:>12.2f} {shared:>12.2f} {shared / legacy:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
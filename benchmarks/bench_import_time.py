@@ -0,0 +1,87 @@
+"""
+Measure how long ``import shortzy`` takes, using ``python -X importtime``.
+
+Each run happens in a fresh interpreter. The cumulative time of the
+``shortzy`` package is reported along with its slowest dependencies, and
+the time to construct a first ``Shortzy`` (which loads the backend).
+
+Run with ``python benchmarks/bench_import_time.py [runs]`` (default 10).
+Pass ``--max-ms N`` to exit non-zero when the median import exceeds N ms.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CONSTRUCT = (
+    "import time; start = time.perf_counter(); import shortzy; "
+    "imported = time.perf_counter(); shortzy.Shortzy('benchmark-key'); "
+    "print((imported - start) * 1000, (time.perf_counter() - imported) * 1000)"
+)
+
+
+def import_times(statement: str = "import shortzy") -> dict:
+    """
+    It returns the cumulative import time in µs of every module ``statement`` imports.
+    """
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+    times = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def construct_times() -> tuple:
+    """
+    It returns the ms spent importing shortzy and then creating the first ``Shortzy``.
+    """
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    output = subprocess.run(
+        [sys.executable, "-c", CONSTRUCT], env=env, capture_output=True, text=True, check=True
+    ).stdout
+    imported, constructed = map(float, output.split())
+    return imported, constructed
+
+
+def main(args) -> int:
+    totals = []
+    slowest = {}
+    for _ in range(args.runs):
+        times = import_times()
+        totals.append(times["shortzy"] / 1000)
+        for name, micros in times.items():
+            if name != "shortzy":
+                slowest[name] = max(slowest.get(name, 0), micros)
+    constructs = [construct_times()[1] for _ in range(args.runs)]
+
+    median = statistics.median(totals)
+    print(f"import shortzy     median {median:8.1f} ms  min {min(totals):8.1f} ms")
+    print(f"first Shortzy()    median {statistics.median(constructs):8.1f} ms")
+    print("slowest imports (cumulative):")
+    for name, micros in sorted(slowest.items(), key=lambda item: -item[1])[:10]:
+        print(f"  {micros / 1000:8.1f} ms  {name}")
+
+    if args.max_ms is not None and median > args.max_ms:
+        print(f"REGRESSION: import takes {median:.1f} ms, limit is {args.max_ms} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("runs", type=int, nargs="?", default=10)
+    parser.add_argument("--max-ms", type=float, default=None)
+    sys.exit(main(parser.parse_args()))
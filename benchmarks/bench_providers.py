@@ -0,0 +1,239 @@
+"""
+Measure shortzy's own overhead and throughput against a local mock provider.
+
+Every backend (Adlinkfly, Shareus, ShareusIO) is pointed at the stand-in
+server from ``mock_server.py`` and driven through ``convert``,
+``bulk_convert`` and ``convert_from_text`` at several sizes and concurrency
+levels. For each scenario req/s, p50/p95/p99 request latency and peak
+Python memory are reported, and written as JSON with ``--output``.
+
+Pass ``--baseline previous.json`` to exit non-zero when req/s drops by more
+than ``--tolerance`` against an earlier run.
+
+Run with ``python benchmarks/bench_providers.py --output results.json``.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+# The checkout's shortzy, without installing it.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mock_server import MockProvider, start_server  # noqa: E402
+
+from shortzy import Shortzy  # noqa: E402
+
+BACKENDS = {
+    "adlinkfly": ("droplink.co", "/api"),
+    "shareus": ("shareus.in", "/shortLink"),
+    "shareusio": ("shareus.io", "/easy_api"),
+}
+
+
+def percentile(values: list, q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def make_links(prefix: str, count: int) -> list:
+    return [f"https://example.com/{prefix}/{i}?ref=bench" for i in range(count)]
+
+
+def make_text(links: list) -> str:
+    return " ".join(f"item {i}: {link}\n" for i, link in enumerate(links))
+
+
+def instrument(shortzy: Shortzy, latencies: list) -> None:
+    """
+    It times every request the backend makes (excluding any queueing before it).
+    """
+    shorten = shortzy.shortener._shorten
+
+    async def timed(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await shorten(*args, **kwargs)
+        finally:
+            latencies.append(time.perf_counter() - start)
+
+    shortzy.shortener._shorten = timed
+
+
+async def scenario_convert(shortzy: Shortzy, links: list, concurrency: int) -> list:
+    queue = iter(links)
+    results = []
+
+    async def worker():
+        for link in queue:
+            try:
+                results.append(await shortzy.convert(link, silently_fail=True))
+            except Exception as e:
+                results.append(e)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return results
+
+
+async def scenario_bulk_convert(shortzy: Shortzy, links: list, concurrency: int) -> list:
+    return await shortzy.bulk_convert(
+        links, silently_fail=True, max_concurrency=concurrency
+    )
+
+
+async def scenario_convert_from_text(
+    shortzy: Shortzy, links: list, concurrency: int
+) -> list:
+    text = make_text(links)
+    try:
+        await shortzy.convert_from_text(text, silently_fail=True)
+    except Exception as e:
+        return [e] * len(links)
+    return []
+
+
+SCENARIOS = {
+    "convert": scenario_convert,
+    "bulk_convert": scenario_bulk_convert,
+    "convert_from_text": scenario_convert_from_text,
+}
+
+
+async def run_scenario(base_url, provider, backend, name, size, concurrency, run_id):
+    base_site, path = BACKENDS[backend]
+    provider.short_host = base_site
+
+    shortzy = Shortzy("benchmark-key", base_site=base_site, pool_size=concurrency)
+    shortzy.shortener.base_url = base_url + path
+    latencies = []
+    instrument(shortzy, latencies)
+    links = make_links(f"{backend}-{name}-{run_id}", size)
+    before = provider.stats()
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    results = await SCENARIOS[name](shortzy, links, concurrency)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    await shortzy.close()
+
+    after = provider.stats()
+    originals = set(links)
+    failures = sum(
+        isinstance(result, BaseException) or result in originals for result in results
+    )
+    return {
+        "backend": backend,
+        "scenario": name,
+        "size": size,
+        "concurrency": concurrency,
+        "requests": after["requests"] - before["requests"],
+        "failures": failures,
+        "seconds": round(elapsed, 4),
+        "req_per_s": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "peak_mem_kb": round(peak / 1024, 1),
+    }
+
+
+def compare(results: list, baseline_path: str, tolerance: float) -> list:
+    with open(baseline_path) as f:
+        baseline = {
+            (r["backend"], r["scenario"], r["size"], r["concurrency"]): r
+            for r in json.load(f)["results"]
+        }
+    regressions = []
+    for result in results:
+        key = (result["backend"], result["scenario"], result["size"], result["concurrency"])
+        previous = baseline.get(key)
+        if previous and result["req_per_s"] < previous["req_per_s"] * (1 - tolerance):
+            regressions.append((key, previous["req_per_s"], result["req_per_s"]))
+    return regressions
+
+
+async def main(args):
+    provider = MockProvider(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit,
+    )
+    runner, base_url = await start_server(provider)
+
+    sizes = [50, 200] if args.quick else [100, 1000, 5000]
+    concurrencies = [10] if args.quick else [10, 100]
+    backends = args.backend or list(BACKENDS)
+
+    results = []
+    header = (
+        f"{'backend':<10} {'scenario':<18} {'size':>6} {'conc':>5} {'req/s':>9} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'fail':>5} {'peak KiB':>9}"
+    )
+    print(header)
+    try:
+        run_id = 0
+        for backend in backends:
+            for name in SCENARIOS:
+                for size in sizes:
+                    for concurrency in concurrencies:
+                        run_id += 1
+                        result = await run_scenario(
+                            base_url, provider, backend, name, size, concurrency, run_id
+                        )
+                        results.append(result)
+                        print(
+                            f"{backend:<10} {name:<18} {size:>6} {concurrency:>5} "
+                            f"{result['req_per_s']:>9} {result['p50_ms']:>8} "
+                            f"{result['p95_ms']:>8} {result['p99_ms']:>8} "
+                            f"{result['failures']:>5} {result['peak_mem_kb']:>9}"
+                        )
+    finally:
+        await runner.cleanup()
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.time(),
+            "latency": args.latency,
+            "jitter": args.jitter,
+            "error_rate": args.error_rate,
+            "rate_limit": args.rate_limit,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        regressions = compare(results, args.baseline, args.tolerance)
+        for key, previous, current in regressions:
+            print(f"REGRESSION {key}: {previous} -> {current} req/s")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--backend", action="append", choices=list(BACKENDS))
+    parser.add_argument("--latency", type=float, default=0.005, help="seconds per request")
+    parser.add_argument("--jitter", type=float, default=0.005, help="extra random seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=None, help="requests per second")
+    parser.add_argument("--quick", action="store_true", help="small sizes only")
+    parser.add_argument("--output", help="write JSON results here")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    sys.exit(asyncio.run(main(parser.parse_args())))
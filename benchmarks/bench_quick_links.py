@@ -0,0 +1,57 @@
+"""
+Compare the batched quick_links() against the previous path, where
+``bulk_convert(quick_link=True)`` created one task per link to format it.
+
+Run with ``python benchmarks/bench_quick_links.py [count]`` (default 1,000,000).
+"""
+import asyncio
+import os
+import sys
+import time
+
+# The checkout's shortzy, without installing it.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from shortzy import Shortzy  # noqa: E402
+
+
+async def legacy_get_quick_link(shortzy: Shortzy, url: str, alias: str = "") -> str:
+    if await shortzy.is_short_link(url):
+        return url
+    quick_link = "https://{base_site}/st?api={api_key}&url={url}&alias={alias}"
+    return quick_link.format(
+        base_site=shortzy.base_site, api_key=shortzy.api_key, url=url, alias=alias
+    )
+
+
+async def legacy_bulk(shortzy: Shortzy, urls: list) -> list:
+    tasks = [asyncio.ensure_future(legacy_get_quick_link(shortzy, url)) for url in urls]
+    return await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    urls = [f"https://example.com/watch?v={i}&list=PL{i % 97}" for i in range(count)]
+    shortzy = Shortzy("benchmark-key")
+
+    start = time.perf_counter()
+    asyncio.run(legacy_bulk(shortzy, urls))
+    legacy = time.perf_counter() - start
+
+    start = time.perf_counter()
+    links = shortzy.quick_links(urls)
+    batched = time.perf_counter() - start
+
+    start = time.perf_counter()
+    shortzy.quick_links(iter(urls))
+    iterator = time.perf_counter() - start
+
+    print(f"{count:,} links")
+    print(f"task per link : {legacy:8.3f}s {count / legacy:>12,.0f} links/s")
+    print(f"quick_links   : {batched:8.3f}s {count / batched:>12,.0f} links/s ({legacy / batched:.1f}x)")
+    print(f"from iterator : {iterator:8.3f}s {count / iterator:>12,.0f} links/s")
+    print(f"sample        : {links[0]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Compare bulk_convert with no RateLimiter, an adaptive one and one with a
+token bucket rate, against throttling sites.
+
+Two mock providers are used: one answering 429 above a request rate, and one
+with a fixed capacity, whose latency climbs as requests queue up beyond it.
+For each, successes, 429s, retries, elapsed time and the limiter's final
+concurrency limit are reported.
+
+Run with ``python benchmarks/bench_rate_limit.py [links]`` (default 2000).
+"""
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+# The checkout's shortzy, without installing it.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mock_server import MockProvider, start_server  # noqa: E402
+
+from shortzy import RateLimiter, RetryPolicy, Shortzy  # noqa: E402
+
+LIMITERS = {
+    "none": lambda: None,
+    "adaptive": lambda: RateLimiter("bench", max_concurrency=200),
+    "rate 280": lambda: RateLimiter("bench", rate=280, max_concurrency=200),
+}
+
+PROVIDERS = {
+    "429 above 300 req/s": dict(latency=0.01, jitter=0.005, rate_limit=300),
+    "capacity 20": dict(latency=0.01, jitter=0.002, capacity=20),
+}
+
+
+async def run(count: int, provider_options: dict, limiter: RateLimiter) -> dict:
+    provider = MockProvider(**provider_options)
+    runner, base_url = await start_server(provider)
+    shortzy = Shortzy(
+        "benchmark-key",
+        pool_size=200,
+        retry=RetryPolicy(attempts=5, backoff=0.05, max_backoff=1),
+        rate_limiter=limiter,
+    )
+    shortzy.shortener.base_url = base_url + "/api"
+    links = [f"https://example.com/{i}" for i in range(count)]
+
+    start = time.perf_counter()
+    results = await shortzy.bulk_convert(links, silently_fail=False, max_concurrency=200)
+    elapsed = time.perf_counter() - start
+    await shortzy.close()
+    await runner.cleanup()
+
+    stats = provider.stats()
+    return {
+        "ok": sum(not isinstance(result, BaseException) for result in results),
+        "requests": stats["requests"],
+        "throttled": stats["throttled"],
+        "max_in_flight": stats["max_in_flight"],
+        "seconds": elapsed,
+        "limit": round(limiter.limit, 1) if limiter else None,
+    }
+
+
+async def main(count: int):
+    print(
+        f"{'provider':<22} {'limiter':<9} {'ok':>6} {'requests':>9} {'429s':>6} "
+        f"{'peak':>5} {'seconds':>8} {'limit':>6}"
+    )
+    for name, options in PROVIDERS.items():
+        for label, make_limiter in LIMITERS.items():
+            result = await run(count, options, make_limiter())
+            print(
+                f"{name:<22} {label:<9} {result['ok']:>6} {result['requests']:>9} "
+                f"{result['throttled']:>6} {result['max_in_flight']:>5} "
+                f"{result['seconds']:>8.2f} {str(result['limit']):>6}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000))
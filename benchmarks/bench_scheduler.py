@@ -0,0 +1,77 @@
+"""
+Measure the latency of interactive convert calls made while a bulk import is
+running, with and without a Scheduler, against a mock provider of limited
+capacity.
+
+Without a scheduler every call competes for the same connections, so an
+interactive link waits behind the whole backlog. With one, interactive links
+are served first and get the reserved slots.
+
+Run with ``python benchmarks/bench_scheduler.py [links]`` (default 3000).
+"""
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+# The checkout's shortzy, without installing it.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mock_server import MockProvider, start_server  # noqa: E402
+
+from shortzy import Scheduler, Shortzy  # noqa: E402
+
+INTERACTIVE_CALLS = 50
+
+
+async def run(count: int, scheduler: Scheduler) -> dict:
+    provider = MockProvider(latency=0.01, jitter=0.002, capacity=40)
+    runner, base_url = await start_server(provider)
+    shortzy = Shortzy("benchmark-key", pool_size=100, scheduler=scheduler)
+    shortzy.shortener.base_url = base_url + "/api"
+
+    links = [f"https://example.com/bulk/{i}" for i in range(count)]
+    start = time.perf_counter()
+    bulk = asyncio.ensure_future(
+        shortzy.bulk_convert(links, silently_fail=False, max_concurrency=count)
+    )
+
+    latencies = []
+    for i in range(INTERACTIVE_CALLS):
+        await asyncio.sleep(0.02)
+        if bulk.done():
+            break
+        sent = time.perf_counter()
+        await shortzy.convert(f"https://example.com/interactive/{i}")
+        latencies.append((time.perf_counter() - sent) * 1000)
+
+    await bulk
+    elapsed = time.perf_counter() - start
+    await shortzy.close()
+    await runner.cleanup()
+
+    return {
+        "calls": len(latencies),
+        "p50": statistics.median(latencies) if latencies else 0.0,
+        "max": max(latencies, default=0.0),
+        "seconds": elapsed,
+    }
+
+
+async def main(count: int):
+    print(f"{'scheduler':<10} {'calls':>6} {'p50 ms':>8} {'max ms':>8} {'bulk s':>7}")
+    for label, make_scheduler in (
+        ("none", lambda: None),
+        ("on", lambda: Scheduler(concurrency=40)),
+    ):
+        result = await run(count, make_scheduler())
+        print(
+            f"{label:<10} {result['calls']:>6} {result['p50']:>8.1f} "
+            f"{result['max']:>8.1f} {result['seconds']:>7.2f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 3000))
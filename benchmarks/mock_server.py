@@ -0,0 +1,187 @@
+"""
+A local stand-in for the shortener APIs, used by the benchmarks.
+
+It speaks the three protocols shortzy understands:
+
+- Adlinkfly ``/api``: JSON with ``status`` and ``shortenedUrl``
+- Shareus ``/shortLink``: the same kind of JSON, served as ``text/html``
+- ShareusIO ``/easy_api``: the short link as plain text
+
+Latency, error rate, a token bucket rate limit (answered with 429 and
+``Retry-After``) and a capacity (requests beyond it queue, so latency rises
+under overload) are configurable. Run it on its own with
+``python benchmarks/mock_server.py --port 8080``.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import time
+
+from aiohttp import web
+
+
+class MockProvider:
+    def __init__(
+        self,
+        short_host: str = "droplink.co",
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit: float = None,
+        burst: int = None,
+        capacity: int = None,
+        seed: int = 0,
+    ):
+        self.short_host = short_host
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.burst = burst or (int(rate_limit) if rate_limit else 0)
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.errors = 0
+        self.throttled = 0
+        self.capacity = capacity
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._tokens = float(self.burst)
+        self._refilled_at = time.monotonic()
+        self._slots = None
+
+    def short_link(self, link: str) -> str:
+        digest = hashlib.blake2b(link.encode(), digest_size=5).hexdigest()
+        return f"https://{self.short_host}/{digest}"
+
+    def _take_token(self) -> bool:
+        if not self.rate_limit:
+            return True
+        now = time.monotonic()
+        self._tokens = min(
+            self.burst, self._tokens + (now - self._refilled_at) * self.rate_limit
+        )
+        self._refilled_at = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+    async def _delay(self):
+        delay = self.latency + self.random.uniform(0, self.jitter)
+        if delay:
+            await asyncio.sleep(delay)
+
+    async def _gate(self):
+        """
+        It applies latency, rate limiting and random failures, returning an error
+        response or None if the request should succeed.
+        """
+        self.requests += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.capacity:
+                if self._slots is None:
+                    self._slots = asyncio.Semaphore(self.capacity)
+                async with self._slots:
+                    await self._delay()
+            else:
+                await self._delay()
+        finally:
+            self.in_flight -= 1
+
+        if not self._take_token():
+            self.throttled += 1
+            retry_after = max(1, round(1 / self.rate_limit))
+            return web.Response(
+                status=429, text="Too Many Requests", headers={"Retry-After": str(retry_after)}
+            )
+
+        if self.error_rate and self.random.random() < self.error_rate:
+            self.errors += 1
+            return web.Response(status=500, text="Internal Server Error")
+        return None
+
+    async def adlinkfly(self, request: web.Request) -> web.Response:
+        error = await self._gate()
+        if error is not None:
+            return error
+        if not request.query.get("api"):
+            return web.json_response({"status": "error", "message": ["Invalid API token"]})
+        return web.json_response(
+            {"status": "success", "shortenedUrl": self.short_link(request.query["url"])}
+        )
+
+    async def shareus(self, request: web.Request) -> web.Response:
+        error = await self._gate()
+        if error is not None:
+            return error
+        if not request.query.get("token"):
+            body = {"status": "error", "message": "Invalid token"}
+        else:
+            body = {"status": "success", "shortlink": self.short_link(request.query["link"])}
+        return web.Response(text=json.dumps(body), content_type="text/html")
+
+    async def shareusio(self, request: web.Request) -> web.Response:
+        error = await self._gate()
+        if error is not None:
+            return error
+        if not request.query.get("key"):
+            return web.Response(text="settings not saved")
+        return web.Response(text=self.short_link(request.query["link"]))
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "throttled": self.throttled,
+            "max_in_flight": self.max_in_flight,
+        }
+
+    def make_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/api", self.adlinkfly)
+        app.router.add_get("/shortLink", self.shareus)
+        app.router.add_get("/easy_api", self.shareusio)
+        return app
+
+
+async def start_server(provider: MockProvider, host: str = "127.0.0.1", port: int = 0):
+    """
+    It starts ``provider`` in the running loop.
+
+    :return: The runner (call ``cleanup()`` to stop it) and the base URL.
+    """
+    runner = web.AppRunner(provider.make_app(), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://{host}:{port}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=None)
+    parser.add_argument("--capacity", type=int, default=None)
+    args = parser.parse_args()
+
+    provider = MockProvider(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit,
+        capacity=args.capacity,
+    )
+    web.run_app(provider.make_app(), host=args.host, port=args.port, access_log=None)
+
+
+if __name__ == "__main__":
+    main()
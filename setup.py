@@ -23,6 +23,9 @@ setup(
     long_description=long_description,
     packages=find_packages(),
     install_requires=['aiohttp',],
+    entry_points={
+        'console_scripts': ['shortzy=shortzy.cli:main'],
+    },
     url="https://github.com/kevinnadar22/shortzy",
     keywords=['python', 'droplink', 'gplink', 'url-shortener', 'earn money', 'shareus', 'adlinkfly'],
     classifiers=[
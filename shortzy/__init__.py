@@ -1 +1,61 @@
-from .main import Shortzy
\ No newline at end of file
+from .main import Shortzy
+from .cache import LinkCache
+from .providers import register_provider
+from .domains import add_short_link_domain
+from .exceptions import (
+    CircuitOpenError,
+    DeadlineExceededError,
+    InvalidResponseError,
+    QueueFullError,
+    RateLimitError,
+    ShortenerAPIError,
+    ShortzyError,
+    TransientError,
+)
+
+# These pull in aiohttp or asyncio, so they are only imported when first used.
+_LAZY_EXPORTS = {
+    "SyncShortzy": ".sync",
+    "Instrumentation": ".instrumentation",
+    "CircuitBreaker": ".resilience",
+    "RetryPolicy": ".resilience",
+    "RateLimiter": ".resilience",
+    "LinkStore": ".store",
+    "Scheduler": ".scheduler",
+}
+
+__all__ = [
+    "Shortzy",
+    "SyncShortzy",
+    "LinkCache",
+    "Instrumentation",
+    "CircuitBreaker",
+    "RetryPolicy",
+    "RateLimiter",
+    "LinkStore",
+    "Scheduler",
+    "register_provider",
+    "add_short_link_domain",
+    "CircuitOpenError",
+    "DeadlineExceededError",
+    "InvalidResponseError",
+    "QueueFullError",
+    "RateLimitError",
+    "ShortenerAPIError",
+    "ShortzyError",
+    "TransientError",
+]
+
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        import importlib
+
+        value = getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_EXPORTS))
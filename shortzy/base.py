@@ -0,0 +1,878 @@
+import asyncio
+import collections
+import contextlib
+import inspect
+import logging
+import re
+import string
+import time
+from urllib.parse import quote
+
+import aiohttp
+
+from .cache import LinkCache
+from .domains import ShortLinkIndex, short_link_domains as known_short_link_domains
+from .extractor import extract_url_spans, replace_spans
+from .exceptions import ShortzyError, TransientError
+from .instrumentation import Instrumentation
+from .store import LinkStore
+from .resilience import CircuitBreaker, RateLimiter, RetryPolicy
+from .scheduler import BULK, INTERACTIVE, Scheduler
+
+logger = logging.getLogger(__name__)
+
+_NO_TRACE = contextlib.nullcontext()
+
+_WHITESPACE_REGEX = re.compile(r"\s")
+_LAST_WHITESPACE_REGEX = re.compile(r"\s(?=\S*\Z)")
+
+
+def _last_whitespace(text: str) -> int:
+    match = _LAST_WHITESPACE_REGEX.search(text)
+    return match.start() if match else -1
+
+
+async def _iter_text_chunks(source, chunk_size: int):
+    if isinstance(source, str):
+        yield source
+    elif hasattr(source, "read"):
+        read = source.read
+        while True:
+            chunk = read(chunk_size)
+            if inspect.isawaitable(chunk):
+                chunk = await chunk
+            if not chunk:
+                return
+            yield chunk
+    elif hasattr(source, "__aiter__"):
+        async for chunk in source:
+            yield chunk
+    else:
+        for chunk in source:
+            yield chunk
+
+
+# Percent-encoding of ASCII links for use as a query value, done by
+# str.translate instead of urllib.parse.quote in the quick link hot loop.
+_QUERY_VALUE_SAFE = string.ascii_letters + string.digits + "-._~:/"
+_QUOTE_TABLE = {
+    code: f"%{code:02X}" for code in range(128) if chr(code) not in _QUERY_VALUE_SAFE
+}
+
+
+async def _close_with_loop(session: aiohttp.ClientSession):
+    # Left suspended until its event loop shuts down async generators (as
+    # ``asyncio.run`` does before closing the loop), which runs the cleanup
+    # while the loop can still await it.
+    try:
+        yield
+    finally:
+        await session.close()
+
+
+def _quote_url(url: str) -> str:
+    if url.isascii():
+        return url.translate(_QUOTE_TABLE)
+    return quote(url, safe=":/")
+
+
+class BaseShortener:
+    """
+    Common plumbing shared by every shortener backend.
+
+    Each shortener owns one long-lived, pooled :class:`aiohttp.ClientSession`
+    which is created lazily on first use and reused for every request, so
+    connections (and their TLS handshakes) are kept alive between links.
+
+    :param api_key: Your API key
+    :type api_key: str
+    :param base_site: The site you want to use
+    :type base_site: str
+    :param session: An existing session to use instead of creating one. A session
+    passed in is never closed by the shortener, defaults to None
+    :type session: aiohttp.ClientSession (optional)
+    :param pool_size: Maximum number of simultaneous connections, defaults to 100
+    :type pool_size: int (optional)
+    :param dns_cache_ttl: Seconds to cache DNS lookups for, defaults to 300
+    :type dns_cache_ttl: int (optional)
+    :param keepalive_timeout: Seconds to keep idle connections open, defaults to 30
+    :type keepalive_timeout: float (optional)
+    :param cache: A :class:`LinkCache` to remember shortened links in, or True for a
+    default one, defaults to None (no caching)
+    :type cache: LinkCache | bool (optional)
+    :param instrumentation: An :class:`Instrumentation` to record request metrics in,
+    or True for a new one, defaults to None (off)
+    :type instrumentation: Instrumentation | bool (optional)
+    :param retry: How to retry transient failures (timeouts, connection errors, 5xx,
+    429), True for the default :class:`RetryPolicy`, defaults to None (no retries)
+    :type retry: RetryPolicy | bool (optional)
+    :param circuit_breaker: A :class:`CircuitBreaker`, or True to use the one shared by
+    every shortener of ``base_site``, defaults to None (off)
+    :type circuit_breaker: CircuitBreaker | bool (optional)
+    :param rate_limiter: A :class:`RateLimiter` pacing the requests, or True to use the
+    one shared by every shortener of ``base_site``, defaults to None (off)
+    :type rate_limiter: RateLimiter | bool (optional)
+    :param scheduler: A :class:`Scheduler` to queue requests through, or True to use the
+    one shared by every shortener on the running event loop, defaults to None (off)
+    :type scheduler: Scheduler | bool (optional)
+    :param store: A :class:`LinkStore` (which can be shared between instances and
+    processes) to persist shortened links in, or a database path to open one,
+    defaults to None (off)
+    :type store: LinkStore | str (optional)
+    :param short_link_domains: More domains whose links are already short and are
+    returned unchanged, on top of ``base_site`` and every registered site
+    :type short_link_domains: list (optional)
+    """
+
+    #: The site's quick link, with ``{base_site}``, ``{api_key}``, ``{url}`` and
+    #: optionally ``{alias}`` placeholders.
+    QUICK_LINK_FORMAT = None
+
+    def __init__(
+        self,
+        api_key: str,
+        base_site: str,
+        session: aiohttp.ClientSession = None,
+        pool_size: int = 100,
+        dns_cache_ttl: int = 300,
+        keepalive_timeout: float = 30,
+        cache: LinkCache = None,
+        instrumentation: Instrumentation = None,
+        retry: RetryPolicy = None,
+        circuit_breaker: CircuitBreaker = None,
+        rate_limiter: RateLimiter = None,
+        scheduler: Scheduler = None,
+        store: LinkStore = None,
+        short_link_domains: list = None,
+    ):
+        self.api_key = api_key
+        self.base_site = base_site
+        self.pool_size = pool_size
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+
+        if not self.api_key:
+            raise Exception("API key not provided")
+
+        if cache is True:
+            cache = LinkCache()
+        elif cache is False:
+            cache = None
+        self.cache = cache
+
+        self._owns_store = isinstance(store, str)
+        if self._owns_store:
+            store = LinkStore(store)
+        self.store = store
+
+        if instrumentation is True:
+            instrumentation = Instrumentation()
+        elif instrumentation is False:
+            instrumentation = None
+        self.instrumentation = instrumentation
+
+        if retry is True:
+            retry = RetryPolicy()
+        elif retry is False:
+            retry = None
+        self.retry = retry
+
+        if circuit_breaker is True:
+            circuit_breaker = CircuitBreaker.for_site(base_site)
+        elif circuit_breaker is False:
+            circuit_breaker = None
+        self.circuit_breaker = circuit_breaker
+
+        if rate_limiter is True:
+            rate_limiter = RateLimiter.for_site(base_site)
+        elif rate_limiter is False:
+            rate_limiter = None
+        self.rate_limiter = rate_limiter
+
+        # True is resolved per event loop, in _get_scheduler.
+        self.scheduler = scheduler or None
+
+        self.short_link_index = ShortLinkIndex(
+            [base_site, *(short_link_domains or ())], parent=known_short_link_domains
+        )
+
+        self._inflight = {}
+        self._flight_callers = collections.Counter()
+        self.coalesced_requests = 0
+
+        self._session = session
+        self._owns_session = session is None
+        self._session_loop = None
+        self._session_guard = None
+        # Replaced while requests may still be using them, closed with the shortener.
+        self._retired_sessions = []
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """
+        It returns the pooled session, creating it on first use.
+
+        A session is bound to the event loop it was created in, so a new one is
+        created if the shortener is reused from another loop (e.g. several
+        ``asyncio.run`` calls). Each one is closed when its loop shuts down, if
+        the shortener was not closed before.
+
+        :return: The shared client session.
+        """
+        if not self._owns_session:
+            return self._session
+
+        loop = asyncio.get_running_loop()
+        if (
+            self._session is None
+            or self._session.closed
+            or self._session_loop is not loop
+        ):
+            if self._session is not None and not self._session.closed:
+                self._release_session(self._session, self._session_loop)
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                ttl_dns_cache=self.dns_cache_ttl,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+            trace_configs = None
+            if self.instrumentation is not None:
+                trace_configs = [self.instrumentation.trace_config]
+            self._session = aiohttp.ClientSession(
+                connector=connector, trace_configs=trace_configs
+            )
+            self._session_loop = loop
+            self._session_guard = _close_with_loop(self._session)
+            await self._session_guard.__anext__()
+        return self._session
+
+    async def close(self) -> None:
+        """
+        It closes the pooled session if it was created by the shortener.
+        """
+        if self._owns_session and self._session is not None:
+            if self._session_loop is asyncio.get_running_loop():
+                await self._session.close()
+            elif not self._session.closed:
+                self._release_session(self._session, self._session_loop)
+            self._session = None
+            self._session_loop = None
+            self._session_guard = None
+
+        retired, self._retired_sessions = self._retired_sessions, []
+        for session, loop, _guard in retired:
+            if loop is asyncio.get_running_loop():
+                await session.close()
+            elif not session.closed:
+                self._release_session(session, loop)
+
+        if self.store is not None:
+            if self._owns_store:
+                await self.store.close()
+            else:
+                await self.store.flush()
+
+    def set_instrumentation(self, instrumentation: Instrumentation) -> None:
+        """
+        It turns request metrics on, or off with None. An owned session already
+        open is replaced on the next request by one reporting to
+        ``instrumentation``, since aiohttp only takes trace configs at creation.
+        """
+        if instrumentation is self.instrumentation:
+            return
+        self.instrumentation = instrumentation
+        if self._owns_session and self._session is not None and not self._session.closed:
+            self._retired_sessions.append(
+                (self._session, self._session_loop, self._session_guard)
+            )
+            self._session = None
+            self._session_loop = None
+            self._session_guard = None
+
+    @staticmethod
+    def _release_session(session: aiohttp.ClientSession, loop) -> None:
+        """
+        It closes a session created in another event loop, which it cannot be
+        awaited from.
+        """
+        if loop.is_running():
+            # In use by another thread, it is closed there.
+            asyncio.run_coroutine_threadsafe(session.close(), loop)
+        else:
+            # Sessions are closed when their loop shuts down async generators,
+            # this one's loop ended without doing so.
+            logger.warning(
+                "Event loop ended without shutting down async generators, "
+                "a pooled session of %r was left open",
+                session,
+            )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def _trace(self):
+        """
+        It returns the context manager backends wrap each request in. Its value is
+        passed to aiohttp as ``trace_request_ctx``.
+        """
+        if self.instrumentation is None:
+            return _NO_TRACE
+        return self.instrumentation.trace(self.base_site)
+
+    def stats(self) -> dict:
+        """
+        It returns a snapshot of the shortener's cache, coalescing and (when
+        enabled) request metrics.
+        """
+        scheduler = self._get_scheduler(create=False)
+        return {
+            "site": self.base_site,
+            "cache": self.cache.stats() if self.cache is not None else None,
+            "store": self.store.stats() if self.store is not None else None,
+            "coalesced_requests": self.coalesced_requests,
+            "circuit_breaker": (
+                self.circuit_breaker.state if self.circuit_breaker is not None else None
+            ),
+            "inflight_requests": len(self._inflight),
+            "rate_limiter": (
+                self.rate_limiter.stats() if self.rate_limiter is not None else None
+            ),
+            "scheduler": scheduler.stats() if scheduler is not None else None,
+            "requests": (
+                self.instrumentation.snapshot()
+                if self.instrumentation is not None
+                else None
+            ),
+        }
+
+    async def _shorten(self, link: str, alias: str = "") -> str:
+        """
+        It asks the site for a short link, raising a :class:`ShortzyError` on failure.
+        """
+        raise NotImplementedError
+
+    async def convert(
+        self,
+        link: str,
+        alias: str = "",
+        silently_fail: bool = False,
+        quick_link: bool = False,
+        priority: str = INTERACTIVE,
+        deadline: float = None,
+        **kwargs
+    ) -> str:
+        return await self._convert(
+            link, alias, silently_fail, quick_link, priority, deadline
+        )
+
+    async def _convert(
+        self,
+        link: str,
+        alias: str = "",
+        silently_fail: bool = False,
+        quick_link: bool = False,
+        priority: str = INTERACTIVE,
+        deadline: float = None,
+        check_store: bool = True,
+    ) -> str:
+        """
+        It does the work of :meth:`convert`. The batch methods pass
+        ``check_store=False`` for links their batch lookup already missed in the store.
+        """
+        is_short_link = await self.is_short_link(link)
+
+        if is_short_link:
+            return link
+
+        if quick_link:
+            return await self.get_quick_link(url=link, alias=alias)
+
+        if self.cache is not None:
+            key = self.cache.make_key(self.base_site, self.api_key, link, alias)
+            short_link = self.cache.get(key)
+            if short_link is not None:
+                return short_link
+
+        try:
+            scheduler = self._get_scheduler()
+            if scheduler is None:
+                return await self._single_flight(link, alias, check_store)
+            return await scheduler.submit(
+                self,
+                link,
+                alias,
+                priority=priority,
+                deadline=deadline,
+                check_store=check_store,
+            )
+        except ShortzyError:
+            if silently_fail:
+                return link
+            raise
+
+    def _get_scheduler(self, create: bool = True) -> Scheduler:
+        if self.scheduler is not True:
+            return self.scheduler
+        if create:
+            return Scheduler.for_loop()
+        try:
+            return Scheduler._registry.get(asyncio.get_running_loop())
+        except RuntimeError:
+            return None
+
+    async def _single_flight(self, link: str, alias: str, check_store: bool = True) -> str:
+        """
+        It makes sure only one request per link is in flight at a time.
+
+        Concurrent callers asking for the same link share the request already
+        running and all get its result (or exception). Each caller awaits it
+        through a shield, so cancelling one of them leaves the others alone; the
+        request is only cancelled with its last caller.
+        ``check_store`` is False when the caller's batch lookup already missed
+        the link in the store.
+        """
+        key = (link, alias or "")
+        task = self._inflight.get(key)
+
+        if task is None:
+            task = asyncio.ensure_future(
+                self._shorten_and_store(link, alias, check_store)
+            )
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._flight_done(key, done))
+        else:
+            self.coalesced_requests += 1
+
+        self._flight_callers[key] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if self._flight_callers[key] == 1:
+                task.cancel()
+            raise
+        finally:
+            self._flight_callers[key] -= 1
+            if not self._flight_callers[key]:
+                del self._flight_callers[key]
+
+    def _flight_done(self, key: tuple, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the exception as retrieved in case every caller was cancelled.
+        if not task.cancelled():
+            task.exception()
+
+    async def _shorten_and_store(
+        self, link: str, alias: str, check_store: bool = True
+    ) -> str:
+        short_link = None
+        if self.store is not None and check_store:
+            short_link = await self.store.get(self.base_site, self.api_key, link, alias)
+        if short_link is None:
+            short_link = await self._shorten_with_retries(link, alias)
+            if self.store is not None:
+                self.store.put(self.base_site, self.api_key, link, alias, short_link)
+        if self.cache is not None:
+            key = self.cache.make_key(self.base_site, self.api_key, link, alias)
+            self.cache.set(key, short_link)
+        return short_link
+
+    async def _prefetch(self, links: list, alias: str = "") -> dict:
+        """
+        It looks up a batch of links in the store with one query, adding the ones
+        found to the cache as well.
+
+        :return: A dict of link to short link, holding only the links found.
+        """
+        if self.store is None or not links:
+            return {}
+        found = await self.store.get_many(self.base_site, self.api_key, links, alias)
+        if self.cache is not None:
+            for link, short_link in found.items():
+                key = self.cache.make_key(self.base_site, self.api_key, link, alias)
+                self.cache.set(key, short_link)
+        return found
+
+    async def _shorten_with_retries(self, link: str, alias: str) -> str:
+        breaker = self.circuit_breaker
+        limiter = self.rate_limiter
+        attempt = 0
+        while True:
+            attempt += 1
+            if breaker is not None:
+                breaker.before_request()
+
+            ticket = None
+            try:
+                if limiter is not None:
+                    ticket = await limiter.acquire()
+                start = time.perf_counter()
+                short_link = await self._shorten(link, alias=alias)
+            except TransientError as e:
+                if breaker is not None:
+                    breaker.record_failure()
+                if ticket is not None:
+                    limiter.release(ticket, error=e)
+                if self.retry is None or attempt >= self.retry.attempts:
+                    raise
+                await asyncio.sleep(self.retry.delay(attempt, e))
+                continue
+            except ShortzyError:
+                # The site answered, so it is up even though it refused the link.
+                if breaker is not None:
+                    breaker.record_success()
+                if ticket is not None:
+                    limiter.release(ticket, latency=time.perf_counter() - start)
+                raise
+            except BaseException:
+                if breaker is not None:
+                    breaker.release()
+                if ticket is not None:
+                    limiter.release(ticket)
+                raise
+
+            if breaker is not None:
+                breaker.record_success()
+            if ticket is not None:
+                limiter.release(ticket, latency=time.perf_counter() - start)
+            return short_link
+
+    async def bulk_convert(
+        self,
+        urls,
+        silently_fail: bool = True,
+        quick_link: bool = False,
+        max_concurrency: int = None,
+        priority: str = BULK,
+        **kwargs
+    ) -> list:
+        if quick_link and not hasattr(urls, "__aiter__"):
+            # Quick links need no request, so they are built in one plain loop.
+            return self.quick_links(urls)
+
+        results = []
+        positions = None
+        store_misses = None
+        if self.store is not None and not quick_link and isinstance(urls, (list, tuple)):
+            # Links stored by an earlier run (or another process) are fetched in
+            # one query, only the rest go through convert.
+            is_short_link = self._is_short_link
+            prefetched = [url for url in urls if not is_short_link(url)]
+            known = await self._prefetch(prefetched)
+            store_misses = {url for url in prefetched if url not in known}
+            if known:
+                results = [known.get(url) for url in urls]
+                positions = [index for index, result in enumerate(results) if result is None]
+                urls = [urls[index] for index in positions]
+
+        async for index, _, result in self.iter_convert(
+            urls,
+            silently_fail=silently_fail,
+            quick_link=quick_link,
+            max_concurrency=max_concurrency,
+            priority=priority,
+            store_misses=store_misses,
+        ):
+            if positions is not None:
+                index = positions[index]
+            elif index >= len(results):
+                results.extend([None] * (index + 1 - len(results)))
+            results[index] = result
+        return results
+
+    async def iter_convert(
+        self,
+        urls,
+        silently_fail: bool = True,
+        quick_link: bool = False,
+        max_concurrency: int = None,
+        priority: str = BULK,
+        store_misses: set = None,
+        **kwargs
+    ):
+        """
+        It converts links with bounded concurrency and yields them as they finish.
+
+        Links are pulled from ``urls`` lazily, so at most ``max_concurrency``
+        requests (and links) are held at any time, whatever the input size.
+
+        :param urls: A sync or async iterable of links
+        :param max_concurrency: Maximum number of requests in flight, defaults to the
+        pool size
+        :type max_concurrency: int (optional)
+        :param store_misses: Links already looked up in the store and not found
+        :type store_misses: set (optional)
+
+        :return: An async iterator of ``(index, original, result)`` tuples in
+        completion order. Failures are yielded as the exception instance.
+        """
+        limit = max_concurrency or self.pool_size
+        if limit < 1:
+            raise ValueError("max_concurrency must be at least 1")
+
+        if hasattr(urls, "__aiter__"):
+            source = urls.__aiter__()
+            next_url = source.__anext__
+        else:
+            source = iter(urls)
+
+            async def next_url():
+                try:
+                    return next(source)
+                except StopIteration:
+                    raise StopAsyncIteration from None
+
+        pending = {}
+        index = 0
+        exhausted = False
+        try:
+            while True:
+                while not exhausted and len(pending) < limit:
+                    try:
+                        url = await next_url()
+                    except StopAsyncIteration:
+                        exhausted = True
+                        break
+                    if self._is_short_link(url):
+                        # Already short, it needs neither a request nor a slot.
+                        yield index, url, url
+                        index += 1
+                        continue
+                    task = asyncio.ensure_future(
+                        self._convert(
+                            link=url,
+                            silently_fail=silently_fail,
+                            quick_link=quick_link,
+                            priority=priority,
+                            check_store=not store_misses or url not in store_misses,
+                        )
+                    )
+                    pending[task] = (index, url)
+                    index += 1
+
+                if not pending:
+                    return
+
+                done, _ = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    position, url = pending.pop(task)
+                    if task.cancelled():
+                        result = asyncio.CancelledError()
+                    else:
+                        result = task.exception() or task.result()
+                    yield position, url, result
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def convert_from_text(
+        self,
+        text: str,
+        silently_fail: bool = True,
+        quick_link: bool = False,
+        priority: str = INTERACTIVE,
+        **kwargs
+    ) -> str:
+        spans = extract_url_spans(text)
+        if not spans:
+            return text
+
+        # Each distinct link is shortened once, the text is then rebuilt in a
+        # single pass from the match spans so overlapping links can't clash.
+        links = self._links_to_shorten(text, spans)
+        if not links:
+            return text
+        shortened_links = await self.bulk_convert(
+            links, silently_fail=silently_fail, quick_link=quick_link, priority=priority
+        )
+        replacements = self._replacements(links, shortened_links, silently_fail)
+        return replace_spans(text, spans, replacements)
+
+    def _links_to_shorten(self, text: str, spans: list) -> list:
+        """
+        It returns the distinct links at ``spans`` that are not short links already.
+        """
+        is_short_link = self._is_short_link
+        return [
+            link
+            for link in dict.fromkeys(text[start:end] for start, end in spans)
+            if not is_short_link(link)
+        ]
+
+    @staticmethod
+    def _replacements(links: list, shortened_links: list, silently_fail: bool) -> dict:
+        replacements = {}
+        for link, short_link in zip(links, shortened_links):
+            if isinstance(short_link, BaseException):
+                if not silently_fail:
+                    raise short_link
+                short_link = link
+            replacements[link] = short_link
+        return replacements
+
+    async def iter_convert_from_text(
+        self,
+        chunks,
+        silently_fail: bool = True,
+        quick_link: bool = False,
+        max_concurrency: int = None,
+        chunk_size: int = 65536,
+        max_token_size: int = 65536,
+        priority: str = BULK,
+        **kwargs
+    ):
+        """
+        It converts links in a stream of text and yields the rewritten text in order.
+
+        The input is split at whitespace (a link never contains any), so links
+        crossing chunk boundaries are handled. At most ``max_concurrency`` links
+        are in flight and as many segments are buffered, so memory stays bounded
+        whatever the document size. A run of more than ``max_token_size``
+        characters without whitespace cannot be a link and is passed through as is.
+
+        :param chunks: A str, a sync or async iterable of str, or a (sync or async)
+        file object opened in text mode
+        :param max_concurrency: Maximum number of requests in flight, defaults to the
+        pool size
+        :type max_concurrency: int (optional)
+        :param chunk_size: Characters read at a time from file objects, defaults to 65536
+        :type chunk_size: int (optional)
+
+        :return: An async iterator of rewritten text chunks.
+        """
+        limit = max_concurrency or self.pool_size
+        if limit < 1:
+            raise ValueError("max_concurrency must be at least 1")
+
+        slots = asyncio.Semaphore(limit)
+        pending = collections.deque()
+
+        async def shorten(link, check_store):
+            try:
+                return await self._convert(
+                    link=link,
+                    silently_fail=silently_fail,
+                    quick_link=quick_link,
+                    priority=priority,
+                    check_store=check_store,
+                )
+            finally:
+                slots.release()
+
+        async def submit(segment):
+            spans = extract_url_spans(segment)
+            links = self._links_to_shorten(segment, spans)
+            known = {} if quick_link else await self._prefetch(links)
+            tasks = []
+            for link in links:
+                if link in known:
+                    future = asyncio.get_running_loop().create_future()
+                    future.set_result(known[link])
+                    tasks.append(future)
+                    continue
+                await slots.acquire()
+                # The batch lookup above already missed it in the store.
+                tasks.append(asyncio.ensure_future(shorten(link, check_store=False)))
+            pending.append((segment, spans, links, tasks))
+
+        async def render():
+            segment, spans, links, tasks = pending.popleft()
+            if not tasks:
+                return segment
+            shortened_links = await asyncio.gather(*tasks, return_exceptions=True)
+            replacements = self._replacements(links, shortened_links, silently_fail)
+            return replace_spans(segment, spans, replacements)
+
+        def head_done():
+            return all(task.done() for task in pending[0][3])
+
+        def passthrough(segment):
+            pending.append((segment, (), (), ()))
+
+        carry = ""
+        skipping = False
+        try:
+            async for chunk in _iter_text_chunks(chunks, chunk_size):
+                if skipping:
+                    match = _WHITESPACE_REGEX.search(chunk)
+                    if match is None:
+                        passthrough(chunk)
+                        continue
+                    passthrough(chunk[:match.start()])
+                    chunk = chunk[match.start():]
+                    skipping = False
+
+                buffer = carry + chunk
+                cut = _last_whitespace(buffer)
+                if cut >= 0:
+                    carry = buffer[cut + 1:]
+                    await submit(buffer[:cut + 1])
+                elif len(buffer) <= max_token_size:
+                    carry = buffer
+                    continue
+                else:
+                    carry = ""
+                    skipping = True
+                    passthrough(buffer)
+
+                while pending and (len(pending) > limit or head_done()):
+                    yield await render()
+
+            if carry:
+                await submit(carry)
+            while pending:
+                yield await render()
+        finally:
+            for _, _, _, tasks in pending:
+                for task in tasks:
+                    task.cancel()
+
+    async def is_short_link(self, link: str) -> bool:
+        return self._is_short_link(link)
+
+    def _is_short_link(self, link: str) -> bool:
+        return self.short_link_index.is_short_link(link)
+
+    def _quick_link_parts(self, alias: str = "") -> tuple:
+        """
+        It fills the site's quick link template once, returning the text that goes
+        before and after the encoded long link.
+        """
+        template = self.QUICK_LINK_FORMAT.format(
+            base_site=self.base_site,
+            api_key=quote(self.api_key, safe=""),
+            url="\0",
+            alias=quote(alias or "", safe=""),
+        )
+        prefix, suffix = template.split("\0")
+        return prefix, suffix
+
+    def quick_links(self, urls, alias: str = "") -> list:
+        """
+        It turns links into quick links without any network request.
+
+        Each link is percent-encoded, so links holding ``&``, ``?`` or ``#`` survive
+        the query string. Links already on the site are returned unchanged.
+
+        :param urls: A list or any iterable of links
+        :param alias: The alias to use for every link
+        :type alias: str (optional)
+
+        :return: The list of quick links.
+        """
+        prefix, suffix = self._quick_link_parts(alias)
+        is_short_link = self._is_short_link
+        return [
+            url if is_short_link(url) else prefix + _quote_url(url) + suffix
+            for url in urls
+        ]
+
+    def quick_link(self, url: str, alias: str = "") -> str:
+        return self.quick_links((url,), alias)[0]
+
+    async def get_quick_link(self, url: str, alias: str = "", **kwargs) -> str:
+        return self.quick_link(url, alias)
@@ -0,0 +1,80 @@
+import time
+from collections import OrderedDict
+
+
+class LinkCache:
+    """
+    A size bounded, in-memory LRU cache of shortened links with TTL based expiry.
+
+    One cache can be shared by several shorteners, entries are keyed by
+    ``(base_site, api_key, link, alias)``.
+
+    :param maxsize: Maximum number of links kept, defaults to 10000
+    :type maxsize: int (optional)
+    :param ttl: Seconds a link stays valid, ``None`` to never expire, defaults to 3600
+    :type ttl: float (optional)
+    """
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 3600):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._data = OrderedDict()
+
+    @staticmethod
+    def make_key(base_site: str, api_key: str, link: str, alias: str = "") -> tuple:
+        return (base_site, api_key, link, alias or "")
+
+    def get(self, key: tuple):
+        """
+        It returns the cached short link for ``key``, or None if missing or expired.
+        """
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: tuple, value: str) -> None:
+        expires_at = None if self.ttl is None else time.monotonic() + self.ttl
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> dict:
+        """
+        It returns a snapshot of the cache counters.
+        """
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -0,0 +1,392 @@
+"""
+Shorten every URL of a large text, CSV or JSONL file.
+
+URLs are streamed from the input in fixed-size batches and spread over a pool
+of worker processes, each running its own event loop with bounded concurrency.
+Results are appended to the output as batches finish, and every finished batch
+is recorded in a checkpoint file, so an interrupted run can be started again
+with the same command and picks up where it stopped. Links are also kept in a
+store next to the output, so the batches that were in flight when the run
+stopped are not shortened (and paid for) twice on resume.
+"""
+import argparse
+import asyncio
+import concurrent.futures
+import csv
+import itertools
+import json
+import multiprocessing.util
+import os
+import sys
+import time
+
+from .main import Shortzy
+from .store import _account
+
+_worker = None
+
+
+def detect_format(path: str) -> str:
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        return "csv"
+    if extension in (".jsonl", ".ndjson"):
+        return "jsonl"
+    return "text"
+
+
+def read_urls(path: str, file_format: str, column: str):
+    """
+    It yields ``(row, url)`` for every URL in the input, lazily.
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        if file_format == "csv":
+            rows = csv.reader(f)
+            header = next(rows, [])
+            if column not in header:
+                raise SystemExit(f"Column {column!r} not found in {path}")
+            index = header.index(column)
+            for row, values in enumerate(rows):
+                if len(values) > index and values[index].strip():
+                    yield row, values[index].strip()
+        elif file_format == "jsonl":
+            for row, line in enumerate(f):
+                if line.strip():
+                    url = json.loads(line).get(column)
+                    if url:
+                        yield row, url
+        else:
+            for row, line in enumerate(f):
+                if line.strip():
+                    yield row, line.strip()
+
+
+def count_lines(path: str) -> int:
+    count = 0
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            count += block.count(b"\n")
+    return count
+
+
+def batched(rows, size: int):
+    rows = iter(rows)
+    for batch_id in itertools.count():
+        batch = list(itertools.islice(rows, size))
+        if not batch:
+            return
+        yield batch_id, batch
+
+
+class Checkpoint:
+    """
+    The batches already written to the output, how many rows they held, and
+    where the output ended after the last one.
+    """
+
+    def __init__(self, path: str, settings: dict):
+        self.path = path
+        self.settings = settings
+        self.done = set()
+        self.rows = 0
+        self.offset = 0
+
+    def load(self) -> bool:
+        if not os.path.exists(self.path):
+            return False
+        with open(self.path, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        if not lines:
+            return False
+        if json.loads(lines[0]) != self.settings:
+            raise SystemExit(
+                f"{self.path} was written with other settings, remove it to start over"
+            )
+        for line in lines[1:]:
+            try:
+                batch_id, offset, rows = map(int, line.split())
+            except ValueError:
+                break
+            self.done.add(batch_id)
+            self.rows += rows
+            self.offset = max(self.offset, offset)
+        return True
+
+    def start(self) -> None:
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(self.settings) + "\n")
+
+    def record(self, batch_id: int, offset: int, rows: int) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(f"{batch_id} {offset} {rows}\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.done.add(batch_id)
+        self.rows += rows
+        self.offset = offset
+
+
+class OutputWriter:
+    def __init__(self, path: str, offset: int):
+        self.format = "csv" if detect_format(path) == "csv" else "jsonl"
+        exists = os.path.exists(path)
+        self.file = open(path, "r+" if exists else "w", newline="", encoding="utf-8")
+        # Anything written after the last checkpoint belongs to an unfinished
+        # batch that is about to be redone.
+        self.file.seek(offset)
+        self.file.truncate()
+        self.csv = csv.writer(self.file) if self.format == "csv" else None
+        if self.csv and offset == 0:
+            self.csv.writerow(["row", "url", "short_url", "error"])
+
+    def write(self, results: list) -> int:
+        for row, url, short_url, error in results:
+            if self.csv:
+                self.csv.writerow([row, url, short_url or "", error or ""])
+            else:
+                record = {"row": row, "url": url, "short_url": short_url, "error": error}
+                self.file.write(json.dumps(record) + "\n")
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        return self.file.tell()
+
+    def close(self) -> None:
+        self.file.close()
+
+
+def _init_worker(options: dict) -> None:
+    global _worker
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    _worker = (loop, Shortzy(**options["shortzy"]), options)
+
+
+def _init_pool_worker(options: dict) -> None:
+    _init_worker(options)
+    # Pool processes leave through multiprocessing's exit handlers, not atexit.
+    multiprocessing.util.Finalize(None, _close_worker, exitpriority=10)
+
+
+def _close_worker() -> None:
+    global _worker
+    if _worker is None:
+        return
+    loop, shortzy, _ = _worker
+    loop.run_until_complete(shortzy.close())
+    loop.close()
+    _worker = None
+
+
+def _shorten_batch(batch_id: int, batch: list) -> tuple:
+    loop, shortzy, options = _worker
+    results = loop.run_until_complete(
+        shortzy.bulk_convert(
+            [url for _, url in batch],
+            silently_fail=False,
+            quick_link=options["quick_link"],
+            max_concurrency=options["concurrency"],
+        )
+    )
+    # A worker killed with the pool is not closed, the batch's links must be on
+    # disk before it counts as done.
+    store = shortzy.shortener.store
+    if store is not None:
+        loop.run_until_complete(store.flush())
+    rows = []
+    for (row, url), result in zip(batch, results):
+        if isinstance(result, BaseException):
+            rows.append((row, url, None, f"{type(result).__name__}: {result}"))
+        else:
+            rows.append((row, url, result, None))
+    return batch_id, rows
+
+
+class Progress:
+    def __init__(self, total: int, done: int = 0, stream=sys.stderr):
+        self.total = total
+        self.done = done
+        self.started_with = done
+        self.errors = 0
+        self.start = time.monotonic()
+        self.stream = stream
+        self._shown_at = 0.0
+
+    def update(self, rows: list, force: bool = False) -> None:
+        self.done += len(rows)
+        self.errors += sum(1 for row in rows if row[3])
+        now = time.monotonic()
+        if not force and now - self._shown_at < 0.5:
+            return
+        self._shown_at = now
+        elapsed = max(now - self.start, 1e-9)
+        rate = (self.done - self.started_with) / elapsed
+        line = f"\r{self.done:,}"
+        if self.total:
+            remaining = max(self.total - self.done, 0)
+            eta = remaining / rate if rate else float("inf")
+            line += f"/{self.total:,} ({self.done / self.total:.1%}) ETA {_duration(eta)}"
+        line += f"  {rate:,.1f} urls/s  {self.errors:,} errors"
+        self.stream.write(line.ljust(79))
+        self.stream.flush()
+
+    def finish(self) -> None:
+        self.update([], force=True)
+        self.stream.write("\n")
+
+
+def _duration(seconds: float) -> str:
+    if seconds == float("inf"):
+        return "--:--:--"
+    seconds = int(seconds)
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def run(args) -> int:
+    file_format = args.format if args.format != "auto" else detect_format(args.input)
+    checkpoint = Checkpoint(
+        args.checkpoint or args.output + ".checkpoint",
+        {
+            "input": os.path.abspath(args.input),
+            "format": file_format,
+            "column": args.column,
+            "batch_size": args.batch_size,
+            "site": args.site,
+            "account": _account(args.api_key),
+            "quick_link": args.quick_link,
+        },
+    )
+    if not checkpoint.load():
+        checkpoint.start()
+        checkpoint.offset = 0
+
+    from .resilience import RetryPolicy
+
+    store = args.store or args.output + ".store"
+
+    options = {
+        "shortzy": {
+            "api_key": args.api_key,
+            "base_site": args.site,
+            "pool_size": args.concurrency,
+            "retry": RetryPolicy(attempts=args.retries) if args.retries > 1 else None,
+            "store": None if args.no_store or args.quick_link else store,
+        },
+        "quick_link": args.quick_link,
+        "concurrency": args.concurrency,
+    }
+
+    total = None
+    if not args.no_count:
+        total = count_lines(args.input) - (1 if file_format == "csv" else 0)
+    writer = OutputWriter(args.output, checkpoint.offset)
+    progress = Progress(total, done=checkpoint.rows)
+
+    batches = (
+        (batch_id, batch)
+        for batch_id, batch in batched(
+            read_urls(args.input, file_format, args.column), args.batch_size
+        )
+        if batch_id not in checkpoint.done
+    )
+
+    def finished(batch_id, rows):
+        offset = writer.write(rows)
+        checkpoint.record(batch_id, offset, len(rows))
+        progress.update(rows)
+
+    try:
+        if args.workers == 0:
+            _init_worker(options)
+            try:
+                for batch_id, batch in batches:
+                    finished(*_shorten_batch(batch_id, batch))
+            finally:
+                _close_worker()
+        else:
+            with concurrent.futures.ProcessPoolExecutor(
+                max_workers=args.workers, initializer=_init_pool_worker, initargs=(options,)
+            ) as pool:
+                pending = set()
+                for batch_id, batch in batches:
+                    pending.add(pool.submit(_shorten_batch, batch_id, batch))
+                    if len(pending) >= args.workers * 2:
+                        done, pending = concurrent.futures.wait(
+                            pending, return_when=concurrent.futures.FIRST_COMPLETED
+                        )
+                        for future in done:
+                            finished(*future.result())
+                for future in concurrent.futures.as_completed(pending):
+                    finished(*future.result())
+    except KeyboardInterrupt:
+        progress.finish()
+        print("Interrupted, run the same command again to resume.", file=sys.stderr)
+        return 130
+    finally:
+        writer.close()
+
+    progress.finish()
+    return 1 if progress.errors else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="shortzy", description=__doc__.strip().splitlines()[0]
+    )
+    parser.add_argument("input", help="text (one URL per line), CSV or JSONL file")
+    parser.add_argument(
+        "-o", "--output", required=True, help="results file, CSV if it ends in .csv else JSONL"
+    )
+    parser.add_argument(
+        "-k",
+        "--api-key",
+        default=os.environ.get("SHORTZY_API_KEY"),
+        help="API key, defaults to $SHORTZY_API_KEY",
+    )
+    parser.add_argument("-s", "--site", default="droplink.co", help="shortener site")
+    parser.add_argument(
+        "-f", "--format", choices=["auto", "text", "csv", "jsonl"], default="auto"
+    )
+    parser.add_argument(
+        "-c", "--column", default="url", help="CSV column or JSONL field holding the URL"
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="worker processes, 0 to run in this process",
+    )
+    parser.add_argument(
+        "-n", "--concurrency", type=int, default=20, help="requests in flight per worker"
+    )
+    parser.add_argument("-b", "--batch-size", type=int, default=500)
+    parser.add_argument("--retries", type=int, default=3, help="tries per URL")
+    parser.add_argument("--checkpoint", help="defaults to OUTPUT.checkpoint")
+    parser.add_argument(
+        "--store",
+        help="SQLite file of links shortened before, shared by the workers and kept"
+        " so a resumed run does not shorten a link twice, defaults to OUTPUT.store",
+    )
+    parser.add_argument(
+        "--no-store",
+        action="store_true",
+        help="keep no store: links of batches unfinished when a run is interrupted"
+        " are shortened again on resume",
+    )
+    parser.add_argument("--quick-link", action="store_true")
+    parser.add_argument(
+        "--no-count", action="store_true", help="skip counting the input for the ETA"
+    )
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    if not args.api_key:
+        print("shortzy: an API key is required (--api-key or $SHORTZY_API_KEY)", file=sys.stderr)
+        return 2
+    return run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
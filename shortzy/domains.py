@@ -0,0 +1,124 @@
+import re
+
+# Scheme and user info are optional, links found in text often have neither.
+_HOST_REGEX = re.compile(r"(?:[A-Za-z][A-Za-z0-9+.\-]*:(?=//))?(?://)?(?:[^@/?#\s]*@)?([^:/?#\s]*)")
+
+_MAX_VERDICTS = 4096
+
+
+def link_host(link: str) -> str:
+    """
+    It returns the lower-cased host name of a link, with or without a scheme.
+    """
+    return _HOST_REGEX.match(link).group(1).rstrip(".").lower()
+
+
+class ShortLinkIndex:
+    """
+    A set of shortener domains, to tell links that are already short.
+
+    A link matches when its host is one of the domains or a subdomain of one
+    (``www.droplink.co`` matches ``droplink.co``, ``notdroplink.co.evil.com``
+    does not). Lookups cost one set probe per label of the host, whatever the
+    number of domains.
+
+    :param domains: The domains to start with
+    :type domains: iterable (optional)
+    :param parent: Another index whose domains count as well, including ones added
+    to it later
+    :type parent: ShortLinkIndex (optional)
+    """
+
+    # Bumped whenever any index changes, so merged views know to rebuild.
+    _generation = 0
+
+    def __init__(self, domains=(), parent: "ShortLinkIndex" = None):
+        self.parent = parent
+        self._domains = set()
+        self._merged = None
+        self._merged_generation = -1
+        self._verdicts = {}
+        for domain in domains:
+            self.add(domain)
+
+    @staticmethod
+    def _normalize(domain: str) -> str:
+        domain = domain.strip().lower()
+        if "/" in domain or ":" in domain:
+            domain = link_host(domain)
+        if domain.startswith("*."):
+            domain = domain[2:]
+        return domain.rstrip(".")
+
+    def add(self, domain: str) -> None:
+        """
+        It adds a domain. A URL or a ``*.example.com`` pattern is reduced to its domain.
+        """
+        domain = self._normalize(domain)
+        if domain:
+            self._domains.add(domain)
+            ShortLinkIndex._generation += 1
+
+    def discard(self, domain: str) -> None:
+        self._domains.discard(self._normalize(domain))
+        ShortLinkIndex._generation += 1
+
+    def domains(self) -> frozenset:
+        """
+        It returns every domain of the index, including those of its parents.
+        """
+        if self._merged_generation != ShortLinkIndex._generation:
+            merged = set(self._domains)
+            if self.parent is not None:
+                merged |= self.parent.domains()
+            self._merged = frozenset(merged)
+            self._merged_generation = ShortLinkIndex._generation
+            self._verdicts.clear()
+        return self._merged
+
+    def __contains__(self, domain: str) -> bool:
+        return domain in self.domains()
+
+    def __iter__(self):
+        return iter(sorted(self.domains()))
+
+    def matches_host(self, host: str) -> bool:
+        """
+        It checks if ``host`` (lower case) is one of the domains or a subdomain of one.
+        """
+        domains = self.domains()
+        while host:
+            if host in domains:
+                return True
+            dot = host.find(".")
+            if dot < 0:
+                return False
+            host = host[dot + 1:]
+        return False
+
+    def is_short_link(self, link: str) -> bool:
+        # Links mostly repeat a handful of hosts, so the answer is remembered
+        # per raw host and the suffix walk is skipped next time.
+        host = _HOST_REGEX.match(link).group(1)
+        if self._merged_generation != ShortLinkIndex._generation:
+            self.domains()
+        verdict = self._verdicts.get(host)
+        if verdict is None:
+            if len(self._verdicts) >= _MAX_VERDICTS:
+                self._verdicts.clear()
+            verdict = self.matches_host(host.rstrip(".").lower())
+            self._verdicts[host] = verdict
+        return verdict
+
+
+#: Every known shortener domain, shared by the whole process. Sites of the
+#: provider registry are added to it as they are registered.
+short_link_domains = ShortLinkIndex()
+
+
+def add_short_link_domain(domain: str) -> None:
+    """
+    It marks the links of ``domain`` (and its subdomains) as already short for every
+    shortener in the process.
+    """
+    short_link_domains.add(domain)
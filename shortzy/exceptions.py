@@ -0,0 +1,61 @@
+class ShortzyError(Exception):
+    """
+    Base class of every error raised while shortening a link.
+    """
+
+
+class ShortenerAPIError(ShortzyError):
+    """
+    The shortener answered but refused the link, e.g. a bad API key or an invalid URL.
+    Retrying will not help.
+    """
+
+
+class InvalidResponseError(ShortzyError):
+    """
+    The shortener answered with something that could not be understood.
+    """
+
+
+class TransientError(ShortzyError):
+    """
+    A failure that may go away on its own: a timeout, a connection error or a 5xx.
+    """
+
+
+class RateLimitError(TransientError):
+    """
+    The shortener answered 429. ``retry_after`` holds the seconds it asked to wait,
+    if it said.
+    """
+
+    def __init__(self, message: str, retry_after: float = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(TransientError):
+    """
+    Requests to ``site`` are failing and are being short-circuited for ``retry_after``
+    more seconds.
+    """
+
+    def __init__(self, site: str, retry_after: float):
+        super().__init__(
+            f"Circuit breaker for {site} is open, retry in {retry_after:.1f}s"
+        )
+        self.site = site
+        self.retry_after = retry_after
+
+
+class QueueFullError(TransientError):
+    """
+    The scheduler's queue is full and it is set to reject new links instead of
+    waiting for room.
+    """
+
+
+class DeadlineExceededError(TransientError):
+    """
+    The deadline of every caller waiting for the link passed before its turn came.
+    """
@@ -0,0 +1,118 @@
+import re
+
+# Top level domains a bare (scheme-less) link may end in.
+TLDS = frozenset(
+    (
+        # generic
+        "com", "net", "org", "edu", "gov", "mil", "aero", "asia", "biz", "cat",
+        "coop", "info", "int", "jobs", "mobi", "museum", "name", "post", "pro",
+        "tel", "travel", "xxx",
+        # country codes
+        "ac", "ad", "ae", "af", "ag", "ai", "al", "am", "an", "ao", "aq", "ar",
+        "as", "at", "au", "aw", "ax", "az", "ba", "bb", "bd", "be", "bf", "bg",
+        "bh", "bi", "bj", "bm", "bn", "bo", "br", "bs", "bt", "bv", "bw", "by",
+        "bz", "ca", "cc", "cd", "cf", "cg", "ch", "ci", "ck", "cl", "cm", "cn",
+        "co", "cr", "cs", "cu", "cv", "cx", "cy", "cz", "dd", "de", "dj", "dk",
+        "dm", "do", "dz", "ec", "ee", "eg", "eh", "er", "es", "et", "eu", "fi",
+        "fj", "fk", "fm", "fo", "fr", "ga", "gb", "gd", "ge", "gf", "gg", "gh",
+        "gi", "gl", "gm", "gn", "gp", "gq", "gr", "gs", "gt", "gu", "gw", "gy",
+        "hk", "hm", "hn", "hr", "ht", "hu", "id", "ie", "il", "im", "in", "io",
+        "iq", "ir", "is", "it", "je", "jm", "jo", "jp", "ke", "kg", "kh", "ki",
+        "km", "kn", "kp", "kr", "kw", "ky", "kz", "la", "lb", "lc", "li", "lk",
+        "lr", "ls", "lt", "lu", "lv", "ly", "ma", "mc", "md", "me", "mg", "mh",
+        "mk", "ml", "mm", "mn", "mo", "mp", "mq", "mr", "ms", "mt", "mu", "mv",
+        "mw", "mx", "my", "mz", "na", "nc", "ne", "nf", "ng", "ni", "nl", "no",
+        "np", "nr", "nu", "nz", "om", "pa", "pe", "pf", "pg", "ph", "pk", "pl",
+        "pm", "pn", "pr", "ps", "pt", "pw", "py", "qa", "re", "ro", "rs", "ru",
+        "rw", "sa", "sb", "sc", "sd", "se", "sg", "sh", "si", "sj", "ja", "sk",
+        "sl", "sm", "sn", "so", "sr", "ss", "st", "su", "sv", "sx", "sy", "sz",
+        "tc", "td", "tf", "tg", "th", "tj", "tk", "tl", "tm", "tn", "to", "tp",
+        "tr", "tt", "tv", "tw", "tz", "ua", "ug", "uk", "us", "uy", "uz", "va",
+        "vc", "ve", "vg", "vi", "vn", "vu", "wf", "ws", "ye", "yt", "yu", "za",
+        "zm", "zw",
+    )
+)
+
+
+def _trie_pattern(words) -> str:
+    """
+    It builds a regex alternation from ``words`` factored as a prefix trie, so the
+    engine follows one branch per character instead of trying every word.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node) -> str:
+        optional = "" in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        if len(branches) == 1 and not optional:
+            return branches[0]
+        group = "(?:" + "|".join(branches) + ")"
+        return group + "?" if optional else group
+
+    return build(trie)
+
+
+_TLD = "(?:" + _trie_pattern(TLDS) + ")"
+
+URL_REGEX = re.compile(
+    r"(?i)\b("
+    r"(?:https?:(?:/{1,3}|[a-z0-9%])|[a-z0-9.\-]+[.]" + _TLD + r"/)"
+    r"(?:[^\s()<>{}\[\]]+|\([^\s()]*?\([^\s()]+\)[^\s()]*?\)|\([^\s]+?\))+"
+    r"(?:\([^\s()]*?\([^\s()]+\)[^\s()]*?\)|\([^\s]+?\)|[^\s`!()\[\]{};:'\".,<>?«»“”‘’])"
+    r"|(?:(?<!@)[a-z0-9]+(?:[.\-][a-z0-9]+)*[.]" + _TLD + r"\b/?(?!@))"
+    r")"
+)
+
+# A link never spans whitespace and always contains a "." or a ":", so only the
+# whitespace separated tokens holding one of those are handed to URL_REGEX.
+_CANDIDATE_REGEX = re.compile(r"(?<!\S)[^\s.:]*[.:]\S*")
+
+
+def extract_url_spans(text: str) -> list:
+    """
+    It finds every link in ``text``.
+
+    :param text: The text to search
+    :type text: str
+
+    :return: A list of ``(start, end)`` spans, in order.
+    """
+    if "." not in text and ":" not in text:
+        return []
+
+    spans = []
+    for candidate in _CANDIDATE_REGEX.finditer(text):
+        start, end = candidate.span()
+        for match in URL_REGEX.finditer(text, start, end):
+            spans.append(match.span(1))
+    return spans
+
+
+def extract_urls(text: str) -> list:
+    """
+    It returns every link found in ``text``, in order.
+    """
+    return [text[start:end] for start, end in extract_url_spans(text)]
+
+
+def replace_spans(text: str, spans: list, replacements: dict) -> str:
+    """
+    It rebuilds ``text`` in a single pass, swapping the link at every span for
+    its entry in ``replacements``. Links without an entry are kept as they are.
+    """
+    parts = []
+    position = 0
+    for start, end in spans:
+        link = text[start:end]
+        parts.append(text[position:start])
+        parts.append(replacements.get(link, link))
+        position = end
+    parts.append(text[position:])
+    return "".join(parts)
@@ -0,0 +1,237 @@
+import collections
+import contextlib
+import logging
+import time
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+PHASES = ("dns", "connect", "wait", "transfer", "parse", "total")
+
+
+def _head_size(params) -> int:
+    # aiohttp does not report the bytes it writes for the request head, so
+    # rebuild the request line and header block the way it serialises them.
+    request_line = f"{params.method} {params.url.raw_path_qs} HTTP/1.1\r\n"
+    headers = "".join(f"{name}: {value}\r\n" for name, value in params.headers.items())
+    return len((request_line + headers + "\r\n").encode("latin-1", "replace"))
+
+
+class RequestTrace:
+    """
+    Timings and counters of a single API request.
+
+    ``phases`` holds seconds spent resolving DNS, connecting (including TLS),
+    waiting for the response headers, receiving the body, parsing it, and in
+    total. Phases that did not happen (e.g. DNS on a reused connection) are
+    left out. ``bytes_sent`` counts the request line and headers as well as
+    the body.
+    """
+
+    __slots__ = (
+        "site",
+        "status",
+        "ok",
+        "error",
+        "reused_connection",
+        "bytes_sent",
+        "bytes_received",
+        "phases",
+        "_marks",
+    )
+
+    def __init__(self, site: str):
+        self.site = site
+        self.status = None
+        self.ok = False
+        self.error = None
+        self.reused_connection = False
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.phases = {}
+        self._marks = {"start": time.perf_counter()}
+
+    def mark(self, name: str) -> None:
+        self._marks[name] = time.perf_counter()
+
+    def _span(self, phase: str, start: str, end: str) -> None:
+        marks = self._marks
+        if start in marks and end in marks:
+            self.phases[phase] = marks[end] - marks[start]
+
+    def finish(self) -> None:
+        self.mark("end")
+        self._span("dns", "dns_start", "dns_end")
+        self._span("connect", "connect_start", "connect_end")
+        self._span("wait", "headers_sent", "headers_received")
+        self._span("transfer", "headers_received", "body_received")
+        self._span("parse", "body_received", "end")
+        self._span("total", "start", "end")
+
+    def as_dict(self) -> dict:
+        return {
+            "site": self.site,
+            "status": self.status,
+            "ok": self.ok,
+            "error": self.error,
+            "reused_connection": self.reused_connection,
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "phases": dict(self.phases),
+        }
+
+
+class Instrumentation:
+    """
+    Opt-in request metrics for shorteners, built on aiohttp's ``TraceConfig``.
+
+    One instance can be shared by several shorteners. Aggregated numbers are
+    available from :meth:`snapshot`, and every finished request is handed to
+    the callbacks registered with :meth:`add_callback` as a :class:`RequestTrace`,
+    e.g. to export it to Prometheus or StatsD.
+
+    Phase timings, status codes and byte counts need the shortener's own
+    session, for a session passed in by the caller only request counts,
+    failures and total time are recorded.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.status_codes = collections.Counter()
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.reused_connections = 0
+        self._phases = {phase: [0, 0.0, 0.0] for phase in PHASES}
+        self._callbacks = []
+        self.trace_config = self._make_trace_config()
+
+    def add_callback(self, callback) -> None:
+        """
+        It registers ``callback(trace)``, called after every request.
+        """
+        self._callbacks.append(callback)
+
+    def remove_callback(self, callback) -> None:
+        self._callbacks.remove(callback)
+
+    @contextlib.contextmanager
+    def trace(self, site: str):
+        """
+        It wraps one request, yielding the :class:`RequestTrace` to pass to
+        aiohttp as ``trace_request_ctx``.
+        """
+        trace = RequestTrace(site)
+        try:
+            yield trace
+        except Exception as e:
+            trace.error = type(e).__name__
+            if isinstance(e, aiohttp.ClientResponseError):
+                trace.status = e.status
+            raise
+        else:
+            trace.ok = True
+        finally:
+            trace.finish()
+            self.record(trace)
+
+    def record(self, trace: RequestTrace) -> None:
+        self.requests += 1
+        if trace.ok:
+            self.succeeded += 1
+        else:
+            self.failed += 1
+        if trace.status is not None:
+            self.status_codes[trace.status] += 1
+        if trace.reused_connection:
+            self.reused_connections += 1
+        self.bytes_sent += trace.bytes_sent
+        self.bytes_received += trace.bytes_received
+
+        for phase, seconds in trace.phases.items():
+            stats = self._phases[phase]
+            stats[0] += 1
+            stats[1] += seconds
+            if seconds > stats[2]:
+                stats[2] = seconds
+
+        for callback in self._callbacks:
+            try:
+                callback(trace)
+            except Exception:
+                logger.exception("Instrumentation callback %r failed", callback)
+
+    def snapshot(self) -> dict:
+        """
+        It returns the aggregated counters and per-phase timings (in ms).
+        """
+        phases = {}
+        for phase, (count, total, longest) in self._phases.items():
+            phases[phase] = {
+                "count": count,
+                "total_ms": total * 1000,
+                "avg_ms": total / count * 1000 if count else 0.0,
+                "max_ms": longest * 1000,
+            }
+        return {
+            "requests": self.requests,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "status_codes": dict(self.status_codes),
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "reused_connections": self.reused_connections,
+            "phases": phases,
+        }
+
+    @staticmethod
+    def _make_trace_config() -> aiohttp.TraceConfig:
+        def marker(name):
+            async def on_event(session, context, params):
+                trace = context.trace_request_ctx
+                if isinstance(trace, RequestTrace):
+                    trace.mark(name)
+
+            return on_event
+
+        async def on_connection_reused(session, context, params):
+            trace = context.trace_request_ctx
+            if isinstance(trace, RequestTrace):
+                trace.reused_connection = True
+
+        async def on_headers_sent(session, context, params):
+            trace = context.trace_request_ctx
+            if isinstance(trace, RequestTrace):
+                trace.mark("headers_sent")
+                trace.bytes_sent += _head_size(params)
+
+        async def on_chunk_sent(session, context, params):
+            trace = context.trace_request_ctx
+            if isinstance(trace, RequestTrace):
+                trace.bytes_sent += len(params.chunk)
+
+        async def on_chunk_received(session, context, params):
+            trace = context.trace_request_ctx
+            if isinstance(trace, RequestTrace):
+                trace.bytes_received += len(params.chunk)
+                trace.mark("body_received")
+
+        async def on_request_end(session, context, params):
+            trace = context.trace_request_ctx
+            if isinstance(trace, RequestTrace):
+                trace.status = params.response.status
+                trace.mark("headers_received")
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_dns_resolvehost_start.append(marker("dns_start"))
+        trace_config.on_dns_resolvehost_end.append(marker("dns_end"))
+        trace_config.on_connection_create_start.append(marker("connect_start"))
+        trace_config.on_connection_create_end.append(marker("connect_end"))
+        trace_config.on_connection_reuseconn.append(on_connection_reused)
+        trace_config.on_request_headers_sent.append(on_headers_sent)
+        trace_config.on_request_chunk_sent.append(on_chunk_sent)
+        trace_config.on_response_chunk_received.append(on_chunk_received)
+        trace_config.on_request_end.append(on_request_end)
+        return trace_config
@@ -1,6 +1,15 @@
-from .shareus import Shareus
-from .adlinkfly import Adlinkfly
-from .shareusio import ShareusIO
+from typing import TYPE_CHECKING
+
+from .cache import LinkCache
+from .providers import registry
+
+if TYPE_CHECKING:
+    import aiohttp
+
+    from .instrumentation import Instrumentation
+    from .resilience import CircuitBreaker, RateLimiter, RetryPolicy
+    from .scheduler import Scheduler
+    from .store import LinkStore
 
 
 class Shortzy:
@@ -11,21 +20,160 @@ class Shortzy:
     :type api_key: str
     :param base_site: The site you want to use, defaults to droplink.co
     :type base_site: str (optional)
+    :param session: An existing session to use for all requests. It is never closed
+    by Shortzy, defaults to None
+    :type session: aiohttp.ClientSession (optional)
+    :param pool_size: Maximum number of simultaneous connections, defaults to 100
+    :type pool_size: int (optional)
+    :param cache: A :class:`shortzy.LinkCache` (which can be shared between instances) or
+    True for a default one, defaults to None (no caching)
+    :type cache: LinkCache | bool (optional)
+    :param instrumentation: An :class:`shortzy.Instrumentation` or True to record request
+    metrics (see :meth:`stats`), defaults to None (off)
+    :type instrumentation: Instrumentation | bool (optional)
+    :param retry: A :class:`shortzy.RetryPolicy` for transient failures, or True for the default one,
+    defaults to None (no retries)
+    :type retry: RetryPolicy | bool (optional)
+    :param circuit_breaker: A :class:`shortzy.CircuitBreaker`, or True to share one per site across the
+    process, defaults to None (off)
+    :type circuit_breaker: CircuitBreaker | bool (optional)
+    :param rate_limiter: A :class:`shortzy.RateLimiter`, or True to share one per site across the
+    process. It caps the request rate and adapts the number of requests in flight to what the site
+    sustains, defaults to None (off)
+    :type rate_limiter: RateLimiter | bool (optional)
+    :param scheduler: A :class:`shortzy.Scheduler`, or True to share one between every Shortzy on
+    the event loop. It serves interactive links ahead of bulk ones and bounds the queue,
+    defaults to None (off)
+    :type scheduler: Scheduler | bool (optional)
+    :param providers: ``(api_key, base_site)`` pairs of several accounts to route links
+    between instead of a single site. Each link goes to the currently fastest healthy one, bar a
+    few (``explore``, defaults to 0.05) sent to the others to keep their estimates fresh,
+    defaults to None
+    :type providers: list (optional)
+    :param hedge: With ``providers``, send a duplicate request to the next best provider when
+    the first is slower than its p95 and keep the first success, defaults to False
+    :type hedge: bool (optional)
+    :param store: A :class:`shortzy.LinkStore`, or the path of a SQLite database, to keep shortened
+    links in across restarts and share them between processes, defaults to None (off)
+    :type store: LinkStore | str (optional)
+    :param short_link_domains: More domains (besides every site Shortzy knows) whose links
+    are already short and are returned unchanged without any request, defaults to None
+    :type short_link_domains: list (optional)
     """
 
-    def __init__(self, api_key: str, base_site: str = "droplink.co"):
+    def __init__(
+        self,
+        api_key: str = None,
+        base_site: str = "droplink.co",
+        session: "aiohttp.ClientSession" = None,
+        pool_size: int = 100,
+        cache: LinkCache = None,
+        instrumentation: "Instrumentation" = None,
+        retry: "RetryPolicy" = None,
+        circuit_breaker: "CircuitBreaker" = None,
+        rate_limiter: "RateLimiter" = None,
+        scheduler: "Scheduler" = None,
+        providers: list = None,
+        hedge: bool = False,
+        store: "LinkStore" = None,
+        short_link_domains: list = None,
+        **kwargs
+    ):
         self.api_key = api_key
         self.base_site = base_site
 
-        if not self.api_key:
+        if not self.api_key and not providers:
             raise Exception("API key not provided")
 
-        if self.base_site == "shareus.in":
-            self.shortener = Shareus(api_key, base_site=base_site)
-        elif self.base_site == "shareus.io":
-            self.shortener = ShareusIO(api_key, base_site=base_site)
-        else:
-            self.shortener = Adlinkfly(api_key, base_site=base_site)
+        if providers and instrumentation is True:
+            # One shared by every provider, so stats() and callbacks cover them all.
+            from .instrumentation import Instrumentation
+
+            instrumentation = Instrumentation()
+
+        kwargs.update(
+            session=session,
+            pool_size=pool_size,
+            instrumentation=instrumentation,
+            retry=retry,
+            circuit_breaker=circuit_breaker,
+            rate_limiter=rate_limiter,
+            short_link_domains=short_link_domains,
+        )
+
+        if not providers:
+            self.shortener = self._make_shortener(
+                api_key,
+                base_site,
+                cache=cache,
+                store=store,
+                scheduler=scheduler,
+                **kwargs
+            )
+            return
+
+        from .multi import MultiShortener
+
+        hedge_options = {
+            option: kwargs.pop(option)
+            for option in ("hedge_delay", "min_samples", "explore")
+            if option in kwargs
+        }
+        shorteners = [
+            self._make_shortener(provider_key, provider_site, **kwargs)
+            for provider_key, provider_site in providers
+        ]
+        self.shortener = MultiShortener(
+            shorteners,
+            hedge=hedge,
+            session=session,
+            pool_size=pool_size,
+            cache=cache,
+            store=store,
+            scheduler=scheduler,
+            instrumentation=instrumentation,
+            short_link_domains=short_link_domains,
+            **hedge_options,
+        )
+        self.api_key = self.shortener.api_key
+        self.base_site = self.shortener.base_site
+
+    @staticmethod
+    def _make_shortener(api_key: str, base_site: str, **kwargs):
+        backend = registry.resolve(base_site)
+        return backend(api_key, base_site=base_site, **kwargs)
+
+    async def close(self) -> None:
+        """
+        It closes the pooled connections held by the shortener.
+        """
+        await self.shortener.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def stats(self) -> dict:
+        """
+        It returns a snapshot of the cache, request coalescing and, when instrumentation
+        is on, per-phase request timings, status codes and bytes transferred.
+        """
+        return self.shortener.stats()
+
+    def add_callback(self, callback) -> None:
+        """
+        It registers ``callback(trace)`` to be called with a :class:`shortzy.instrumentation.RequestTrace`
+        after every API request. Instrumentation is turned on if it was off.
+
+        :param callback: A function taking one argument
+        """
+        if self.shortener.instrumentation is None:
+            from .instrumentation import Instrumentation
+
+            self.shortener.set_instrumentation(Instrumentation())
+        self.shortener.instrumentation.add_callback(callback)
 
     async def convert(
         self,
@@ -51,6 +199,20 @@ class Shortzy:
         :param quick_link: If you want to get a quick link, set this to True, defaults to False
         :type quick_link: bool (optional)
 
+        :param priority: ``"interactive"`` or ``"bulk"``, used by the ``scheduler``,
+        defaults to "interactive"
+        :type priority: str (optional)
+
+        :param deadline: With a ``scheduler``, seconds within which the link should be served. Nearer
+        deadlines go first, and a link still queued once it passes fails with
+        :class:`DeadlineExceededError`, defaults to None
+        :type deadline: float (optional)
+
+        :raises ShortenerAPIError: The site refused the link (e.g. a bad API key), retrying won't help
+        :raises TransientError: Timeouts, connection errors, 5xx or 429 (:class:`RateLimitError`) that
+        outlasted the retries, or :class:`CircuitOpenError` while the site's breaker is open
+        :raises QueueFullError: The ``scheduler`` queue is full and set to reject
+
         :return: The shortened link is being returned.
         """
         return await self.shortener.convert(
@@ -76,6 +238,18 @@ class Shortzy:
 
         return await self.shortener.get_quick_link(link, alias)
 
+    def quick_links(self, links, alias: str = "") -> list:
+        """
+        It converts links to quick links in one go, without any network request or event loop.
+
+        :param links: A list or any iterable of links
+        :param alias: The alias to use for every link
+        :type alias: str (optional)
+
+        :return: The list of quick links.
+        """
+        return self.shortener.quick_links(links, alias)
+
     async def convert_from_text(
         self, text: str, silently_fail: bool = False, quick_link: bool = False, **kwargs
     ) -> str:
@@ -95,17 +269,59 @@ class Shortzy:
         :param quick_link: If you want to get a quick link, set this to True, defaults to False
         :type quick_link: bool (optional)
 
+        :param priority: ``"interactive"`` or ``"bulk"``, used by the ``scheduler``,
+        defaults to "interactive"
+        :type priority: str (optional)
+
         :return: The shortened link is being returned.
         """
         return await self.shortener.convert_from_text(
             text, silently_fail, quick_link, **kwargs
         )
 
+    def iter_convert_from_text(
+        self,
+        chunks,
+        silently_fail: bool = False,
+        quick_link: bool = False,
+        max_concurrency: int = None,
+        **kwargs
+    ):
+        """
+        It converts all links from a stream of text, for documents too large to hold in memory.
+
+        :param chunks: A str, a sync or async iterable of str chunks, or a file object opened in text mode
+
+        :param silently_fail: If this is set to True, then instead of raising an exception, it will return
+        the original link, defaults to False
+        :type silently_fail: bool (optional)
+
+        :param quick_link: If you want to get a quick link, set this to True, defaults to False
+        :type quick_link: bool (optional)
+
+        :param max_concurrency: Maximum number of requests in flight, defaults to the pool size
+        :type max_concurrency: int (optional)
+
+        :param priority: ``"interactive"`` or ``"bulk"``, used by the ``scheduler``,
+        defaults to "bulk"
+        :type priority: str (optional)
+
+        :return: An async iterator of the rewritten text chunks, in order.
+        """
+        return self.shortener.iter_convert_from_text(
+            chunks,
+            silently_fail=silently_fail,
+            quick_link=quick_link,
+            max_concurrency=max_concurrency,
+            **kwargs,
+        )
+
     async def bulk_convert(
         self,
         links: list,
         silently_fail: bool = False,
         quick_link: bool = False,
+        max_concurrency: int = None,
         **kwargs
     ) -> list:
         """
@@ -121,15 +337,64 @@ class Shortzy:
         :param quick_link: If you want to get a quick link, set this to True, defaults to False
         :type quick_link: bool (optional)
 
+        :param max_concurrency: Maximum number of requests in flight, defaults to the pool size
+        :type max_concurrency: int (optional)
+
+        :param priority: ``"interactive"`` or ``"bulk"``, used by the ``scheduler``,
+        defaults to "bulk"
+        :type priority: str (optional)
+
         :return: The list of shortened links is being returned.
         """
         return await self.shortener.bulk_convert(
-            links, silently_fail=silently_fail, quick_link=quick_link, **kwargs
+            links,
+            silently_fail=silently_fail,
+            quick_link=quick_link,
+            max_concurrency=max_concurrency,
+            **kwargs,
+        )
+
+    def iter_convert(
+        self,
+        links,
+        silently_fail: bool = False,
+        quick_link: bool = False,
+        max_concurrency: int = None,
+        **kwargs
+    ):
+        """
+        It converts links as they arrive and yields each one as soon as it is done.
+
+        :param links: A list, generator or async iterable of links. It is consumed lazily.
+
+        :param silently_fail: If this is set to True, then instead of raising an exception, it will return
+        the original link, defaults to False
+        :type silently_fail: bool (optional)
+
+        :param quick_link: If you want to get a quick link, set this to True, defaults to False
+        :type quick_link: bool (optional)
+
+        :param max_concurrency: Maximum number of requests in flight, defaults to the pool size
+        :type max_concurrency: int (optional)
+
+        :param priority: ``"interactive"`` or ``"bulk"``, used by the ``scheduler``,
+        defaults to "bulk"
+        :type priority: str (optional)
+
+        :return: An async iterator of ``(index, original, result)`` tuples in completion order.
+        """
+        return self.shortener.iter_convert(
+            links,
+            silently_fail=silently_fail,
+            quick_link=quick_link,
+            max_concurrency=max_concurrency,
+            **kwargs,
         )
 
     async def is_short_link(self, link: str) -> bool:
         """
-        It checks if the link is a short link.
+        It checks if the link is a short link, i.e. it is on a known shortener site
+        or one of its subdomains.
 
         :param link: The link you want to check
         :type link: str
@@ -138,17 +403,18 @@ class Shortzy:
         """
         return await self.shortener.is_short_link(link)
 
+    def add_short_link_domain(self, domain: str) -> None:
+        """
+        It treats links on ``domain`` (and its subdomains) as already short from now on,
+        for this instance. Use :func:`shortzy.add_short_link_domain` for every instance.
+
+        :param domain: A domain such as ``example.com``
+        :type domain: str
+        """
+        self.shortener.short_link_index.add(domain)
+
     @staticmethod
     def available_websites():
-        available_websites = [
-            "droplink.co",
-            "gplinks.in",
-            "tnlink.in",
-            "za.gl",
-            "du-link.in",
-            "viplink.in",
-            "shorturllink.in",
-            "shareus.in",
-            "All droplink.co Alternative Websites",
-        ]
+        available_websites = registry.available_websites()
+        available_websites.append("All droplink.co Alternative Websites")
         return "\n".join(available_websites)
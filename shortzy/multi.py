@@ -0,0 +1,258 @@
+import asyncio
+import collections
+import random
+import time
+
+from .base import BaseShortener
+from .exceptions import ShortzyError, TransientError
+
+
+class ProviderHealth:
+    """
+    Moving latency and error-rate estimates of one provider.
+
+    The error rate also decays with time, halving every ``recovery_half_life``
+    seconds without a sample. A provider pushed to the back by its failures,
+    and so sent nothing anymore, is thereby tried again once it has had time to
+    recover, like a half-open :class:`CircuitBreaker`.
+
+    :param shortener: The backend being tracked
+    :type shortener: BaseShortener
+    :param alpha: Weight of the newest sample in the moving averages, defaults to 0.2
+    :type alpha: float (optional)
+    :param window: Number of recent latencies the p95 is computed over, defaults to 200
+    :type window: int (optional)
+    :param recovery_half_life: Seconds for the error rate to halve without samples,
+    defaults to 30
+    :type recovery_half_life: float (optional)
+    """
+
+    def __init__(
+        self,
+        shortener: BaseShortener,
+        alpha: float = 0.2,
+        window: int = 200,
+        recovery_half_life: float = 30,
+    ):
+        self.shortener = shortener
+        self.alpha = alpha
+        self.recovery_half_life = recovery_half_life
+        self.latency = None
+        self._error_rate = 0.0
+        self._sampled_at = time.monotonic()
+        self.requests = 0
+        self._latencies = collections.deque(maxlen=window)
+        self._p95 = None
+
+    @property
+    def error_rate(self) -> float:
+        if not self._error_rate:
+            return 0.0
+        idle = time.monotonic() - self._sampled_at
+        return self._error_rate * 0.5 ** (idle / self.recovery_half_life)
+
+    def record(self, latency: float, ok: bool) -> None:
+        self.requests += 1
+        error_rate = self.error_rate
+        self._error_rate = error_rate + self.alpha * ((0.0 if ok else 1.0) - error_rate)
+        self._sampled_at = time.monotonic()
+        if ok:
+            self._record_latency(latency)
+
+    def record_unfinished(self, elapsed: float) -> None:
+        """
+        It records a request cancelled after ``elapsed`` seconds (e.g. it lost a
+        hedge). Its latency is at least that, so it only ever raises the estimates.
+        """
+        self.requests += 1
+        if self.latency is None or elapsed > self.latency:
+            self._record_latency(elapsed)
+
+    def _record_latency(self, latency: float) -> None:
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency += self.alpha * (latency - self.latency)
+        self._latencies.append(latency)
+        self._p95 = None
+
+    @property
+    def p95(self) -> float:
+        if self._p95 is None and self._latencies:
+            ordered = sorted(self._latencies)
+            self._p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+        return self._p95
+
+    @property
+    def healthy(self) -> bool:
+        breaker = self.shortener.circuit_breaker
+        if breaker is not None and breaker.state == breaker.OPEN:
+            return False
+        return self.error_rate < 0.5
+
+    def score(self) -> float:
+        """
+        It returns the expected cost of a request, lower is better. Providers
+        without samples score 0 so they get tried.
+        """
+        if self.latency is None:
+            return 0.0
+        return self.latency / max(1.0 - self.error_rate, 0.05)
+
+    def stats(self) -> dict:
+        return {
+            "site": self.shortener.base_site,
+            "requests": self.requests,
+            "latency_ms": self.latency * 1000 if self.latency is not None else None,
+            "p95_ms": self.p95 * 1000 if self.p95 is not None else None,
+            "error_rate": self.error_rate,
+            "healthy": self.healthy,
+        }
+
+
+class MultiShortener(BaseShortener):
+    """
+    Spreads links over several shortener accounts, sending each one to the
+    currently fastest healthy provider.
+
+    With ``hedge`` on, a duplicate request goes to the next best provider when
+    the first has not answered within its observed p95 latency (or
+    ``hedge_delay`` before enough samples exist). The first success wins and
+    the other request is cancelled, the time it ran counting as a lower bound
+    of its provider's latency.
+
+    A share ``explore`` of the links goes to a random other provider instead,
+    so the estimates of providers that are not first keep being refreshed.
+
+    :param shorteners: The backends to route between
+    :type shorteners: list
+    :param hedge: Send hedged duplicate requests, defaults to False
+    :type hedge: bool (optional)
+    :param hedge_delay: Seconds to wait before hedging while a provider's p95 is
+    unknown, defaults to 1
+    :type hedge_delay: float (optional)
+    :param min_samples: Requests a provider needs before its p95 is trusted for
+    hedging, defaults to 20
+    :type min_samples: int (optional)
+    :param explore: Share of the links sent to another provider than the best one,
+    defaults to 0.05
+    :type explore: float (optional)
+    """
+
+    def __init__(
+        self,
+        shorteners: list,
+        hedge: bool = False,
+        hedge_delay: float = 1.0,
+        min_samples: int = 20,
+        explore: float = 0.05,
+        **kwargs
+    ):
+        if not shorteners:
+            raise ValueError("At least one provider is required")
+
+        short_link_domains = [shortener.base_site for shortener in shorteners]
+        short_link_domains.extend(kwargs.pop("short_link_domains", None) or ())
+        super().__init__(
+            ",".join(shortener.api_key for shortener in shorteners),
+            ",".join(shortener.base_site for shortener in shorteners),
+            short_link_domains=short_link_domains,
+            **kwargs
+        )
+        self.providers = [ProviderHealth(shortener) for shortener in shorteners]
+        self.hedge = hedge
+        self.hedge_delay = hedge_delay
+        self.min_samples = min_samples
+        self.explore = explore
+        self.hedged_requests = 0
+        self.explored_requests = 0
+
+    def ranked(self) -> list:
+        """
+        It returns the providers best first, healthy ones ahead of the rest.
+        """
+        return sorted(
+            self.providers, key=lambda provider: (not provider.healthy, provider.score())
+        )
+
+    def _route(self) -> list:
+        ranked = self.ranked()
+        if len(ranked) > 1 and random.random() < self.explore:
+            self.explored_requests += 1
+            ranked.insert(0, ranked.pop(random.randrange(1, len(ranked))))
+        return ranked
+
+    async def _attempt(self, provider: ProviderHealth, link: str, alias: str) -> str:
+        start = time.perf_counter()
+        try:
+            short_link = await provider.shortener._shorten_with_retries(link, alias)
+        except ShortzyError:
+            provider.record(time.perf_counter() - start, ok=False)
+            raise
+        except asyncio.CancelledError:
+            provider.record_unfinished(time.perf_counter() - start)
+            raise
+        provider.record(time.perf_counter() - start, ok=True)
+        return short_link
+
+    def _hedge_after(self, provider: ProviderHealth) -> float:
+        if provider.requests < self.min_samples or provider.p95 is None:
+            return self.hedge_delay
+        return provider.p95
+
+    async def _shorten(self, link: str, alias: str = "") -> str:
+        ranked = self._route()
+        primary = ranked[0]
+        if not self.hedge or len(ranked) < 2:
+            return await self._attempt(primary, link, alias)
+
+        tasks = {asyncio.ensure_future(self._attempt(primary, link, alias))}
+        hedged = False
+        timeout = self._hedge_after(primary)
+        error = None
+        try:
+            while tasks:
+                done, tasks = await asyncio.wait(
+                    tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                results = [(task.exception(), task) for task in done]
+                for exception, task in results:
+                    if exception is None:
+                        return task.result()
+                    error = exception
+
+                # Hedge when the primary is slow, or straight away if it failed
+                # with an error another provider might not have.
+                slow = not done
+                failed = not tasks and isinstance(error, TransientError)
+                if not hedged and (slow or failed):
+                    hedged = True
+                    timeout = None
+                    self.hedged_requests += 1
+                    tasks.add(
+                        asyncio.ensure_future(self._attempt(ranked[1], link, alias))
+                    )
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def set_instrumentation(self, instrumentation) -> None:
+        super().set_instrumentation(instrumentation)
+        for provider in self.providers:
+            provider.shortener.set_instrumentation(instrumentation)
+
+    def _quick_link_parts(self, alias: str = "") -> tuple:
+        return self.ranked()[0].shortener._quick_link_parts(alias)
+
+    def stats(self) -> dict:
+        stats = super().stats()
+        stats["hedged_requests"] = self.hedged_requests
+        stats["explored_requests"] = self.explored_requests
+        stats["providers"] = [provider.stats() for provider in self.providers]
+        return stats
+
+    async def close(self) -> None:
+        for provider in self.providers:
+            await provider.shortener.close()
+        await super().close()
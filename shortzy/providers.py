@@ -0,0 +1,141 @@
+"""
+Which backend handles which shortener site.
+
+Backends are recorded as ``"module:Class"`` strings and only imported the
+first time a site needs them, so ``import shortzy`` stays cheap. Other
+packages can add backends without touching shortzy by declaring an entry
+point in the ``shortzy.providers`` group, named after the site (or a glob
+pattern of sites) it handles::
+
+    entry_points={
+        "shortzy.providers": ["example.com = my_package.backend:ExampleShortener"],
+    }
+"""
+import fnmatch
+import importlib
+
+from .domains import short_link_domains
+
+ENTRY_POINT_GROUP = "shortzy.providers"
+
+
+class ProviderRegistry:
+    """
+    Maps shortener sites to the backend classes that talk to them.
+
+    Sites are looked up exactly first, then against the registered glob
+    patterns (e.g. ``*.shareus.io``) in registration order, and finally fall
+    back to the default backend.
+
+    :param default: The backend for sites nothing else matches
+    :type default: str | type
+    """
+
+    def __init__(self, default):
+        self.default = default
+        self._sites = {}
+        self._patterns = []
+        self._listed = []
+        self._loaded = {}
+        self._entry_points_loaded = False
+
+    def register(self, site: str, backend, listed: bool = True) -> None:
+        """
+        It registers a backend for a site or a glob pattern of sites. Links on the
+        site count as already short from then on (see :mod:`shortzy.domains`).
+
+        :param site: A site such as ``droplink.co`` or a pattern such as ``*.shareus.io``
+        :type site: str
+        :param backend: The backend class or a ``"module:Class"`` string to import on first use
+        :type backend: str | type
+        :param listed: Show the site in :meth:`available_websites`, defaults to True
+        :type listed: bool (optional)
+        """
+        site = site.lower()
+        if any(char in site for char in "*?["):
+            self._patterns = [
+                (pattern, target) for pattern, target in self._patterns if pattern != site
+            ]
+            self._patterns.append((site, backend))
+            if site.startswith("*.") and not any(char in site[2:] for char in "*?["):
+                short_link_domains.add(site)
+        else:
+            self._sites[site] = backend
+            short_link_domains.add(site)
+        if listed and site not in self._listed:
+            self._listed.append(site)
+
+    def resolve(self, base_site: str) -> type:
+        """
+        It returns the backend class for ``base_site``, importing it if needed.
+        """
+        self._load_entry_points()
+        site = base_site.lower()
+        backend = self._sites.get(site)
+        if backend is None:
+            backend = next(
+                (target for pattern, target in self._patterns if fnmatch.fnmatchcase(site, pattern)),
+                self.default,
+            )
+        return self._load(backend)
+
+    def available_websites(self) -> list:
+        """
+        It returns the sites and patterns registered to be listed, in registration order.
+        """
+        self._load_entry_points()
+        return list(self._listed)
+
+    def _load(self, backend) -> type:
+        if isinstance(backend, type):
+            return backend
+        cls = self._loaded.get(backend)
+        if cls is None:
+            if isinstance(backend, str):
+                module_name, _, attribute = backend.partition(":")
+                cls = getattr(importlib.import_module(module_name), attribute)
+            else:
+                # An entry point, its value may name extras or a nested attribute.
+                cls = backend.load()
+            self._loaded[backend] = cls
+        return cls
+
+    def _load_entry_points(self) -> None:
+        if self._entry_points_loaded:
+            return
+        self._entry_points_loaded = True
+        # Deferred as well, scanning the installed distributions is the slow part.
+        from importlib import metadata
+
+        try:
+            entry_points = metadata.entry_points(group=ENTRY_POINT_GROUP)
+        except TypeError:
+            # Python < 3.10
+            entry_points = metadata.entry_points().get(ENTRY_POINT_GROUP, [])
+        for entry_point in entry_points:
+            self.register(entry_point.name, entry_point)
+
+
+registry = ProviderRegistry(default="shortzy.adlinkfly:Adlinkfly")
+
+for _site in (
+    "droplink.co",
+    "gplinks.in",
+    "tnlink.in",
+    "za.gl",
+    "du-link.in",
+    "viplink.in",
+    "shorturllink.in",
+):
+    registry.register(_site, "shortzy.adlinkfly:Adlinkfly")
+registry.register("shareus.in", "shortzy.shareus:Shareus")
+registry.register("shareus.io", "shortzy.shareusio:ShareusIO")
+del _site
+
+
+def register_provider(site: str, backend, listed: bool = True) -> None:
+    """
+    It registers a backend for a site (or a glob pattern of sites) process-wide.
+    See :meth:`ProviderRegistry.register`.
+    """
+    registry.register(site, backend, listed=listed)
@@ -0,0 +1,457 @@
+import asyncio
+import collections
+import contextlib
+import email.utils
+import random
+import threading
+import time
+
+import aiohttp
+
+from .exceptions import (
+    CircuitOpenError,
+    InvalidResponseError,
+    RateLimitError,
+    ShortenerAPIError,
+    ShortzyError,
+    TransientError,
+)
+
+_REGISTRY_LOCK = threading.Lock()
+
+
+def classify_error(error: Exception) -> ShortzyError:
+    """
+    It maps an aiohttp or timeout error raised while talking to a shortener to a
+    :class:`ShortzyError`, telling transient failures from permanent ones.
+    """
+    if isinstance(error, ShortzyError):
+        return error
+
+    if isinstance(error, aiohttp.ContentTypeError):
+        return InvalidResponseError(f"Unexpected response: {error!r}")
+
+    if isinstance(error, aiohttp.ClientResponseError):
+        message = f"{error.status}, {error.message}"
+        if error.status == 429:
+            headers = error.headers or {}
+            return RateLimitError(message, parse_retry_after(headers.get("Retry-After")))
+        if error.status >= 500 or error.status == 408:
+            return TransientError(message)
+        return ShortenerAPIError(message)
+
+    if isinstance(
+        error,
+        (asyncio.TimeoutError, aiohttp.ClientConnectionError, aiohttp.ClientPayloadError),
+    ):
+        return TransientError(str(error) or type(error).__name__)
+
+    return ShortzyError(str(error))
+
+
+@contextlib.contextmanager
+def parsing_response():
+    """
+    It turns the errors of reading a shortener's answer (invalid JSON, a missing
+    field, a wrong type) into :class:`InvalidResponseError`. Only wrap the parsing
+    in it, the same errors raised anywhere else are bugs.
+    """
+    try:
+        yield
+    except (ValueError, KeyError, TypeError) as e:
+        raise InvalidResponseError(f"Unexpected response: {e!r}") from e
+
+
+def parse_retry_after(value: str) -> float:
+    """
+    It parses a ``Retry-After`` header, given either in seconds or as an HTTP date.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+class RetryPolicy:
+    """
+    How transient failures are retried: exponential backoff with full jitter.
+
+    :param attempts: Total number of tries, including the first, defaults to 3
+    :type attempts: int (optional)
+    :param backoff: Delay before the first retry in seconds, doubled for every
+    following one, defaults to 0.5
+    :type backoff: float (optional)
+    :param max_backoff: Upper bound of any delay, including a server's
+    ``Retry-After``, defaults to 30
+    :type max_backoff: float (optional)
+    :param jitter: Pick a random delay between 0 and the backoff, defaults to True
+    :type jitter: bool (optional)
+    """
+
+    def __init__(
+        self,
+        attempts: int = 3,
+        backoff: float = 0.5,
+        max_backoff: float = 30,
+        jitter: bool = True,
+    ):
+        if attempts < 1:
+            raise ValueError("attempts must be at least 1")
+
+        self.attempts = attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+
+    def delay(self, attempt: int, error: TransientError = None) -> float:
+        """
+        It returns the seconds to wait before retry number ``attempt`` (from 1).
+        """
+        delay = min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+        if self.jitter:
+            delay = random.uniform(0, delay)
+
+        retry_after = getattr(error, "retry_after", None)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_backoff))
+        return delay
+
+
+class CircuitBreaker:
+    """
+    Stops sending requests to a site after repeated transient failures.
+
+    After ``failure_threshold`` consecutive failures the breaker opens and every
+    request fails fast with :class:`CircuitOpenError` for ``recovery_timeout``
+    seconds. It then lets a single probe through; its success closes the breaker
+    again, its failure re-opens it.
+
+    Use :meth:`for_site` to share one breaker between every shortener of a site.
+    It can be used from several event loops and threads at once.
+
+    :param site: The site the breaker guards
+    :type site: str
+    :param failure_threshold: Consecutive failures that open the breaker, defaults to 5
+    :type failure_threshold: int (optional)
+    :param recovery_timeout: Seconds to stay open before probing, defaults to 30
+    :type recovery_timeout: float (optional)
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    _registry = {}
+
+    def __init__(
+        self, site: str, failure_threshold: int = 5, recovery_timeout: float = 30
+    ):
+        self.site = site
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_site(cls, site: str, **kwargs) -> "CircuitBreaker":
+        """
+        It returns the process-wide breaker of ``site``, creating it with ``kwargs``
+        on first use.
+        """
+        with _REGISTRY_LOCK:
+            breaker = cls._registry.get(site)
+            if breaker is None:
+                breaker = cls._registry[site] = cls(site, **kwargs)
+        return breaker
+
+    @property
+    def state(self) -> str:
+        # Read once, another thread may close the breaker meanwhile.
+        opened_at = self.opened_at
+        if opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - opened_at >= self.recovery_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def before_request(self) -> None:
+        """
+        It raises :class:`CircuitOpenError` if the request must not be sent.
+        """
+        with self._lock:
+            state = self.state
+            if state == self.CLOSED:
+                return
+            if state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return
+            retry_after = max(
+                0.0, self.recovery_timeout - (time.monotonic() - self.opened_at)
+            )
+        raise CircuitOpenError(self.site, retry_after)
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def release(self) -> None:
+        """
+        It gives up a probe that ended without telling anything about the site's
+        health, e.g. because it was cancelled.
+        """
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self._probing or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self._probing = False
+
+
+class RateLimiter:
+    """
+    Paces the requests sent to a site: a token bucket caps the request rate and
+    an adaptive (AIMD) limit caps how many requests are in flight.
+
+    The concurrency limit grows by ``increase`` for every ``limit`` successful
+    requests, and is multiplied by ``decrease`` on a 429, a timeout or another
+    transient failure, or when the average latency climbs above
+    ``latency_tolerance`` times the best latency seen. Failures of requests
+    sent before the last decrease don't shrink it again. A 429 with
+    ``Retry-After`` also holds back every request of the site until then.
+
+    Use :meth:`for_site` to share one limiter between every shortener of a site.
+    It can be used from several event loops and threads at once.
+
+    :param site: The site the limiter paces
+    :type site: str
+    :param rate: Requests per second, ``None`` for no rate limit, defaults to None
+    :type rate: float (optional)
+    :param burst: Requests that may be sent at once after an idle period,
+    defaults to ``rate`` (at least 1)
+    :type burst: float (optional)
+    :param initial_concurrency: Concurrency limit to start from, defaults to 4
+    :type initial_concurrency: int (optional)
+    :param min_concurrency: Lowest concurrency limit, defaults to 1
+    :type min_concurrency: int (optional)
+    :param max_concurrency: Highest concurrency limit, defaults to 100
+    :type max_concurrency: int (optional)
+    :param increase: Additive increase of the limit, defaults to 1
+    :type increase: float (optional)
+    :param decrease: Multiplicative decrease of the limit, defaults to 0.5
+    :type decrease: float (optional)
+    :param latency_tolerance: How many times the best latency the average may
+    reach before the limit shrinks, defaults to 2
+    :type latency_tolerance: float (optional)
+    """
+
+    _registry = {}
+
+    def __init__(
+        self,
+        site: str,
+        rate: float = None,
+        burst: float = None,
+        initial_concurrency: int = 4,
+        min_concurrency: int = 1,
+        max_concurrency: int = 100,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+        latency_tolerance: float = 2.0,
+    ):
+        if min_concurrency < 1 or max_concurrency < min_concurrency:
+            raise ValueError("Need 1 <= min_concurrency <= max_concurrency")
+        if not 0 < decrease < 1:
+            raise ValueError("decrease must be between 0 and 1")
+
+        self.site = site
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate or 1.0)
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_tolerance = latency_tolerance
+
+        self.limit = float(
+            min(max(initial_concurrency, min_concurrency), max_concurrency)
+        )
+        self.in_flight = 0
+        self.latency = None
+        self.best_latency = None
+        self.samples = 0
+        self.decreases = 0
+        self.throttled = 0
+
+        self._tokens = self.burst
+        self._refilled_at = time.monotonic()
+        self._blocked_until = 0.0
+        self._epoch = 0
+        self._waiters = collections.deque()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_site(cls, site: str, **kwargs) -> "RateLimiter":
+        """
+        It returns the process-wide limiter of ``site``, creating it with ``kwargs``
+        on first use.
+        """
+        with _REGISTRY_LOCK:
+            limiter = cls._registry.get(site)
+            if limiter is None:
+                limiter = cls._registry[site] = cls(site, **kwargs)
+        return limiter
+
+    def _allowed(self) -> int:
+        return max(self.min_concurrency, int(self.limit))
+
+    async def acquire(self) -> int:
+        """
+        It waits for a free slot and a token.
+
+        :return: A ticket to hand back to :meth:`release` once the request is over.
+        """
+        await self._take_slot()
+        try:
+            with self._lock:
+                ticket = self._epoch
+                wait = self._reserve_token()
+                if wait > 0:
+                    self.throttled += 1
+            if wait > 0:
+                await asyncio.sleep(wait)
+        except BaseException:
+            self._release_slot()
+            raise
+        return ticket
+
+    def _reserve_token(self) -> float:
+        now = time.monotonic()
+        if self.rate is None:
+            return self._blocked_until - now
+        self._tokens = min(
+            self.burst, self._tokens + (now - self._refilled_at) * self.rate
+        )
+        self._refilled_at = now
+        # Tokens may go negative, each waiter reserving its own place in line.
+        self._tokens -= 1
+        wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        return max(wait, self._blocked_until - now)
+
+    async def _take_slot(self) -> None:
+        with self._lock:
+            if not self._waiters and self.in_flight < self._allowed():
+                self.in_flight += 1
+                return
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                    raise
+            # Granted just before the cancellation, a slot is held.
+            if waiter.done() and not waiter.cancelled():
+                self._release_slot()
+            raise
+
+    def _grant(self) -> None:
+        # Called with the lock held. The slot is taken on the waiter's behalf
+        # and handed over in its own event loop.
+        while self._waiters and self.in_flight < self._allowed():
+            waiter = self._waiters.popleft()
+            self.in_flight += 1
+            try:
+                waiter.get_loop().call_soon_threadsafe(self._wake, waiter)
+            except RuntimeError:
+                # Its event loop is closed.
+                self.in_flight -= 1
+
+    def _wake(self, waiter: asyncio.Future) -> None:
+        if waiter.done():
+            self._release_slot()
+        else:
+            waiter.set_result(None)
+
+    def _release_slot(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            self._grant()
+
+    def release(self, ticket: int, latency: float = None, error: Exception = None) -> None:
+        """
+        It frees the slot of a finished request and adapts the limit to how it went.
+
+        :param ticket: What :meth:`acquire` returned
+        :param latency: Seconds the request took, when the site answered
+        :param error: The :class:`TransientError` the request failed with
+        """
+        with self._lock:
+            self.in_flight -= 1
+            if error is not None:
+                retry_after = getattr(error, "retry_after", None)
+                if retry_after:
+                    self._blocked_until = max(
+                        self._blocked_until, time.monotonic() + retry_after
+                    )
+                self._back_off(ticket)
+            elif latency is not None:
+                self._record_latency(ticket, latency)
+            self._grant()
+
+    def _record_latency(self, ticket: int, latency: float) -> None:
+        self.samples += 1
+        if self.latency is None:
+            self.latency = self.best_latency = latency
+        else:
+            self.latency += 0.2 * (latency - self.latency)
+            # The best latency follows improvements at once and worsening slowly.
+            if latency < self.best_latency:
+                self.best_latency = latency
+            else:
+                self.best_latency += 0.001 * (latency - self.best_latency)
+
+        if self.samples >= 10 and self.latency > self.best_latency * self.latency_tolerance:
+            self._back_off(ticket)
+        else:
+            self.limit = min(
+                self.max_concurrency, self.limit + self.increase / max(self.limit, 1.0)
+            )
+
+    def _back_off(self, ticket: int) -> None:
+        if ticket != self._epoch:
+            return
+        self._epoch += 1
+        self.decreases += 1
+        self.limit = max(self.min_concurrency, self.limit * self.decrease)
+
+    def stats(self) -> dict:
+        return {
+            "site": self.site,
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "waiting": len(self._waiters),
+            "rate": self.rate,
+            "latency_ms": self.latency * 1000 if self.latency is not None else None,
+            "best_latency_ms": (
+                self.best_latency * 1000 if self.best_latency is not None else None
+            ),
+            "decreases": self.decreases,
+            "throttled": self.throttled,
+        }
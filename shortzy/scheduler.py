@@ -0,0 +1,394 @@
+import asyncio
+import heapq
+import itertools
+import time
+import weakref
+
+from .exceptions import DeadlineExceededError, QueueFullError
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+
+_PRIORITIES = {INTERACTIVE: 0, BULK: 1}
+
+
+class _Job:
+    """
+    One link waiting to be shortened, shared by every caller asking for it.
+    """
+
+    __slots__ = (
+        "shortener",
+        "link",
+        "alias",
+        "priority",
+        "deadline",
+        "expires_at",
+        "future",
+        "callers",
+        "submitted_at",
+        "dispatched",
+        "check_store",
+    )
+
+    def __init__(
+        self,
+        shortener,
+        link: str,
+        alias: str,
+        priority: int,
+        deadline: float,
+        check_store: bool = True,
+    ):
+        self.shortener = shortener
+        self.link = link
+        self.alias = alias
+        self.priority = priority
+        self.deadline = deadline
+        self.expires_at = deadline
+        self.future = asyncio.get_running_loop().create_future()
+        self.callers = 1
+        self.submitted_at = time.monotonic()
+        self.dispatched = False
+        self.check_store = check_store
+
+    def join(self, priority: int, deadline: float) -> bool:
+        """
+        It adds a caller, returning True if the job must move up the queue.
+        """
+        self.callers += 1
+        # Ordered by the most urgent caller, dropped only once every caller
+        # has given up.
+        if self.expires_at is not None:
+            self.expires_at = None if deadline is None else max(self.expires_at, deadline)
+        before = self.sort_key()
+        self.priority = min(self.priority, priority)
+        if deadline is not None and (self.deadline is None or deadline < self.deadline):
+            self.deadline = deadline
+        return self.sort_key() < before
+
+    def sort_key(self) -> tuple:
+        return (
+            self.priority,
+            self.deadline if self.deadline is not None else float("inf"),
+        )
+
+
+class Scheduler:
+    """
+    Orders the shortening requests of every shortener sharing it, so a large
+    bulk import does not hold up the links users are waiting on.
+
+    Links go through a bounded queue. Interactive links are always served
+    before bulk ones, and within a class the earliest deadline goes first, then
+    the oldest. A few slots are kept for interactive links even when bulk work
+    saturates the others. Links arriving within ``batch_window`` are admitted
+    together: each distinct link is queued once however many callers want it,
+    and a :class:`LinkStore` is asked for the whole batch in one query.
+
+    A scheduler serves one event loop, use :meth:`for_loop` to share one between
+    every shortener on a loop.
+
+    :param concurrency: Most links being shortened at once, defaults to 100
+    :type concurrency: int (optional)
+    :param interactive_reserve: Slots bulk links may not use, defaults to a tenth
+    of ``concurrency``
+    :type interactive_reserve: int (optional)
+    :param max_queue: Most calls waiting or being served at once, defaults to 10000
+    :type max_queue: int (optional)
+    :param overflow: ``"wait"`` for room when the queue is full, or ``"reject"``
+    to raise :class:`QueueFullError`, defaults to "wait"
+    :type overflow: str (optional)
+    :param batch_window: Seconds to collect arriving links before admitting
+    them, defaults to 0.002
+    :type batch_window: float (optional)
+    """
+
+    _registry = weakref.WeakKeyDictionary()
+
+    def __init__(
+        self,
+        concurrency: int = 100,
+        interactive_reserve: int = None,
+        max_queue: int = 10000,
+        overflow: str = "wait",
+        batch_window: float = 0.002,
+    ):
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        if overflow not in ("wait", "reject"):
+            raise ValueError('overflow must be "wait" or "reject"')
+
+        if interactive_reserve is None:
+            interactive_reserve = concurrency // 10
+        self.concurrency = concurrency
+        self.interactive_reserve = min(interactive_reserve, concurrency - 1)
+        self.max_queue = max_queue
+        self.overflow = overflow
+        self.batch_window = batch_window
+
+        self.running = 0
+        self.submitted = 0
+        self.deduplicated = 0
+        self.rejected = 0
+        self.expired = 0
+        self.batches = 0
+        self._wait_times = {name: [0, 0.0, 0.0] for name in _PRIORITIES}
+
+        self._loop = None
+        self._room = None
+        self._heap = []
+        self._queued = {}
+        self._incoming = []
+        self._flush_handle = None
+        self._counter = itertools.count()
+
+    @classmethod
+    def for_loop(cls, loop: asyncio.AbstractEventLoop = None, **kwargs) -> "Scheduler":
+        """
+        It returns the scheduler shared by every shortener on ``loop`` (the running
+        one by default), creating it with ``kwargs`` on first use.
+        """
+        loop = loop or asyncio.get_running_loop()
+        scheduler = cls._registry.get(loop)
+        if scheduler is None:
+            scheduler = cls._registry[loop] = cls(**kwargs)
+        return scheduler
+
+    def _bind(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is None:
+            self._loop = loop
+            self._room = asyncio.Semaphore(self.max_queue)
+        elif self._loop is not loop:
+            raise RuntimeError("This Scheduler is bound to another event loop")
+
+    async def submit(
+        self,
+        shortener,
+        link: str,
+        alias: str = "",
+        priority: str = INTERACTIVE,
+        deadline: float = None,
+        check_store: bool = True,
+    ) -> str:
+        """
+        It queues a link and returns its short link once its turn has come.
+
+        :param shortener: The :class:`BaseShortener` to shorten the link with
+        :param priority: ``"interactive"`` or ``"bulk"``, defaults to "interactive"
+        :type priority: str (optional)
+        :param deadline: Seconds within which the link should be served. Links
+        with a nearer deadline go first, and a link still queued when it passes
+        fails with :class:`DeadlineExceededError`, defaults to None
+        :type deadline: float (optional)
+        :param check_store: False if the caller already missed the link in the store,
+        defaults to True
+        :type check_store: bool (optional)
+
+        :raises QueueFullError: The queue is full and ``overflow`` is "reject"
+        """
+        if priority not in _PRIORITIES:
+            raise ValueError(f"Unknown priority {priority!r}")
+        self._bind()
+
+        if self._room.locked():
+            if self.overflow == "reject":
+                self.rejected += 1
+                raise QueueFullError(f"{self.max_queue} links already queued")
+        await self._room.acquire()
+
+        try:
+            self.submitted += 1
+            future = self._loop.create_future()
+            self._incoming.append(
+                (
+                    shortener,
+                    link,
+                    alias or "",
+                    _PRIORITIES[priority],
+                    None if deadline is None else time.monotonic() + deadline,
+                    check_store,
+                    future,
+                )
+            )
+            if self._flush_handle is None:
+                self._flush_handle = self._loop.call_later(self.batch_window, self._flush)
+
+            try:
+                job = await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    self._leave(future.result())
+                raise
+            # The job is shared, a caller giving up must not cancel it for the others.
+            try:
+                return await asyncio.shield(job.future)
+            except asyncio.CancelledError:
+                self._leave(job)
+                raise
+        finally:
+            self._room.release()
+
+    def _leave(self, job: _Job) -> None:
+        job.callers -= 1
+        if job.callers == 0 and not job.dispatched:
+            # Nobody wants it anymore.
+            self._unqueue(job)
+            job.future.cancel()
+
+    def _unqueue(self, job: _Job) -> None:
+        key = (id(job.shortener), job.link, job.alias)
+        if self._queued.get(key) is job:
+            del self._queued[key]
+
+    def _flush(self) -> None:
+        self._flush_handle = None
+        batch, self._incoming = self._incoming, []
+        if batch:
+            task = asyncio.ensure_future(self._admit(batch))
+            task.add_done_callback(_retrieve)
+
+    async def _admit(self, batch: list) -> None:
+        self.batches += 1
+        new_jobs = []
+        for shortener, link, alias, priority, deadline, check_store, future in batch:
+            if future.cancelled():
+                continue
+            key = (id(shortener), link, alias)
+            job = self._queued.get(key)
+            if job is None:
+                job = _Job(shortener, link, alias, priority, deadline, check_store)
+                self._queued[key] = job
+                new_jobs.append(job)
+            else:
+                self.deduplicated += 1
+                if job.join(priority, deadline):
+                    # The old heap entry is skipped once this one is served.
+                    self._push(job)
+            future.set_result(job)
+
+        await self._resolve_known(new_jobs)
+        for job in new_jobs:
+            if not job.future.done():
+                self._push(job)
+        self._dispatch()
+
+    async def _resolve_known(self, jobs: list) -> None:
+        """
+        It answers the jobs whose link is already in their shortener's store,
+        asking each store once for the whole batch. The cache was checked by
+        :meth:`BaseShortener.convert` before queueing.
+        """
+        groups = {}
+        for job in jobs:
+            shortener = job.shortener
+            if shortener.store is not None and job.check_store:
+                groups.setdefault((id(shortener), job.alias), []).append(job)
+
+        for group in groups.values():
+            shortener = group[0].shortener
+            try:
+                found = await shortener._prefetch(
+                    [job.link for job in group], group[0].alias
+                )
+            except Exception:
+                # The requests below will look the links up one by one.
+                continue
+            for job in group:
+                short_link = found.get(job.link)
+                if short_link is not None:
+                    self._finish(job, short_link)
+                else:
+                    job.check_store = False
+
+    def _push(self, job: _Job) -> None:
+        heapq.heappush(self._heap, (*job.sort_key(), next(self._counter), job))
+
+    def _finish(self, job: _Job, short_link: str = None, error: Exception = None) -> None:
+        self._unqueue(job)
+        if job.future.done():
+            return
+        if error is not None:
+            job.future.set_exception(error)
+        else:
+            job.future.set_result(short_link)
+
+    def _dispatch(self) -> None:
+        while self._heap and self.running < self.concurrency:
+            priority, deadline, _, job = self._heap[0]
+            # Entries left behind by a job that moved up the queue, was served
+            # or is no longer wanted.
+            if job.dispatched or job.future.done() or (priority, deadline) != job.sort_key():
+                heapq.heappop(self._heap)
+                continue
+            if priority != 0 and self.running >= self.concurrency - self.interactive_reserve:
+                return
+            heapq.heappop(self._heap)
+
+            now = time.monotonic()
+            if job.expires_at is not None and job.expires_at <= now:
+                self.expired += 1
+                self._finish(job, error=DeadlineExceededError(f"{job.link} waited too long"))
+                continue
+
+            job.dispatched = True
+            self._unqueue(job)
+            stats = self._wait_times[BULK if job.priority else INTERACTIVE]
+            waited = now - job.submitted_at
+            stats[0] += 1
+            stats[1] += waited
+            stats[2] = max(stats[2], waited)
+
+            self.running += 1
+            task = asyncio.ensure_future(self._execute(job))
+            task.add_done_callback(_retrieve)
+
+    async def _execute(self, job: _Job) -> None:
+        try:
+            short_link = await job.shortener._single_flight(
+                job.link, job.alias, job.check_store
+            )
+        except asyncio.CancelledError:
+            job.future.cancel()
+            raise
+        except Exception as e:
+            self._finish(job, error=e)
+        else:
+            self._finish(job, short_link)
+        finally:
+            self.running -= 1
+            self._dispatch()
+
+    def stats(self) -> dict:
+        """
+        It returns the queue depth per priority and how long links waited for their
+        turn (in ms).
+        """
+        depth = {name: 0 for name in _PRIORITIES}
+        for job in self._queued.values():
+            if not job.dispatched and not job.future.done():
+                depth[BULK if job.priority else INTERACTIVE] += 1
+        wait_ms = {}
+        for name, (count, total, longest) in self._wait_times.items():
+            wait_ms[name] = {
+                "count": count,
+                "avg_ms": total / count * 1000 if count else 0.0,
+                "max_ms": longest * 1000,
+            }
+        return {
+            "queued": depth,
+            "incoming": len(self._incoming),
+            "running": self.running,
+            "submitted": self.submitted,
+            "deduplicated": self.deduplicated,
+            "rejected": self.rejected,
+            "expired": self.expired,
+            "batches": self.batches,
+            "wait": wait_ms,
+        }
+
+
+def _retrieve(task: asyncio.Task) -> None:
+    if not task.cancelled():
+        task.exception()
@@ -0,0 +1,325 @@
+import asyncio
+import concurrent.futures
+import functools
+import hashlib
+import logging
+import queue
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS links (
+    base_site TEXT NOT NULL,
+    account TEXT NOT NULL,
+    link TEXT NOT NULL,
+    alias TEXT NOT NULL,
+    short_link TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (base_site, account, alias, link)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS links_created_at ON links (created_at);
+"""
+
+# Well below SQLITE_MAX_VARIABLE_NUMBER on every SQLite version.
+_MAX_PARAMETERS = 500
+
+_STOP = object()
+
+
+@functools.lru_cache(maxsize=256)
+def _account(api_key: str) -> str:
+    # Links belong to the account that shortened them, the key itself is not
+    # written to disk.
+    return hashlib.sha256((api_key or "").encode()).hexdigest()[:32]
+
+
+class LinkStore:
+    """
+    A persistent mapping of ``(base_site, api_key, link, alias)`` to short links,
+    kept in a SQLite database in WAL mode. Only a hash of the API key is stored.
+
+    Any number of shorteners, threads and processes can share one database file,
+    so workers that restart or run side by side reuse each other's links instead
+    of asking the site again. Reads run on a small thread pool and writes are
+    queued and committed in batches by a background thread, so neither blocks
+    the event loop.
+
+    :param path: The database file, created if missing
+    :type path: str
+    :param ttl: Seconds a link stays valid, ``None`` to keep links forever,
+    defaults to None
+    :type ttl: float (optional)
+    :param batch_size: Most writes committed in one transaction, defaults to 500
+    :type batch_size: int (optional)
+    :param flush_interval: Seconds a write may wait for others to share its
+    transaction, defaults to 0.05
+    :type flush_interval: float (optional)
+    :param compact_interval: Seconds between deletions of expired links (with a
+    ``ttl``), defaults to 3600
+    :type compact_interval: float (optional)
+    :param busy_timeout: Seconds to wait for another process holding the write
+    lock, defaults to 5
+    :type busy_timeout: float (optional)
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl: float = None,
+        batch_size: int = 500,
+        flush_interval: float = 0.05,
+        compact_interval: float = 3600,
+        busy_timeout: float = 5,
+    ):
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+
+        self.path = path
+        self.ttl = ttl
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.compact_interval = compact_interval
+        self.busy_timeout = busy_timeout
+
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.batches = 0
+        self.write_errors = 0
+        self.compacted = 0
+
+        # Written but not committed yet, so lookups see them straight away.
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._closed = False
+
+        connection = self._connect()
+        try:
+            connection.executescript(_SCHEMA)
+        finally:
+            connection.close()
+
+        self._queue = queue.SimpleQueue()
+        self._readers = concurrent.futures.ThreadPoolExecutor(
+            max_workers=2, thread_name_prefix="shortzy-store"
+        )
+        self._writer = threading.Thread(
+            target=self._write_loop, name="shortzy-store-writer", daemon=True
+        )
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(
+            self.path, timeout=self.busy_timeout, isolation_level=None
+        )
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def _reader(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._local.connection = self._connect()
+        return connection
+
+    def _cutoff(self) -> float:
+        return time.time() - self.ttl if self.ttl is not None else float("-inf")
+
+    async def get(self, base_site: str, api_key: str, link: str, alias: str = ""):
+        """
+        It returns the short link stored for the account, or None if missing or expired.
+        """
+        found = await self.get_many(base_site, api_key, (link,), alias)
+        return found.get(link)
+
+    async def get_many(self, base_site: str, api_key: str, links, alias: str = "") -> dict:
+        """
+        It looks up many links of an account at once, in as few queries as possible.
+
+        :return: A dict of link to short link, holding only the links found.
+        """
+        alias = alias or ""
+        account = _account(api_key)
+        found = {}
+        missing = []
+        with self._lock:
+            for link in dict.fromkeys(links):
+                short_link = self._pending.get((base_site, account, link, alias))
+                if short_link is None:
+                    missing.append(link)
+                else:
+                    found[link] = short_link
+
+        requested = len(found) + len(missing)
+        if missing:
+            loop = asyncio.get_running_loop()
+            found.update(
+                await loop.run_in_executor(
+                    self._readers, self._select, base_site, account, missing, alias
+                )
+            )
+        self.hits += len(found)
+        self.misses += requested - len(found)
+        return found
+
+    def _select(self, base_site: str, account: str, links: list, alias: str) -> dict:
+        connection = self._reader()
+        cutoff = self._cutoff()
+        found = {}
+        for start in range(0, len(links), _MAX_PARAMETERS):
+            chunk = links[start:start + _MAX_PARAMETERS]
+            rows = connection.execute(
+                "SELECT link, short_link FROM links"
+                " WHERE base_site = ? AND account = ? AND alias = ?"
+                f" AND link IN ({','.join('?' * len(chunk))}) AND created_at > ?",
+                (base_site, account, alias, *chunk, cutoff),
+            )
+            found.update(rows)
+        return found
+
+    def put(
+        self, base_site: str, api_key: str, link: str, alias: str, short_link: str
+    ) -> None:
+        """
+        It queues a link to be written. It returns immediately, see :meth:`flush`.
+        """
+        if self._closed:
+            return
+        key = (base_site, _account(api_key), link, alias or "")
+        with self._lock:
+            self._pending[key] = short_link
+        self._queue.put((key, short_link, time.time()))
+
+    async def flush(self) -> None:
+        """
+        It waits until every link queued so far is committed.
+        """
+        if self._closed:
+            return
+        done = concurrent.futures.Future()
+        self._queue.put(done)
+        await asyncio.wrap_future(done)
+
+    def _write_loop(self) -> None:
+        connection = self._connect()
+        next_compaction = time.monotonic()
+        try:
+            while True:
+                item = self._queue.get()
+                batch = []
+                waiters = []
+                deadline = time.monotonic() + self.flush_interval
+                while True:
+                    if item is _STOP:
+                        self._commit(connection, batch)
+                        return
+                    if isinstance(item, concurrent.futures.Future):
+                        waiters.append(item)
+                        break
+                    batch.append(item)
+                    if len(batch) >= self.batch_size:
+                        break
+                    timeout = deadline - time.monotonic()
+                    try:
+                        item = self._queue.get(timeout=max(timeout, 0))
+                    except queue.Empty:
+                        break
+
+                self._commit(connection, batch)
+                for waiter in waiters:
+                    waiter.set_result(None)
+
+                if (
+                    batch
+                    and self.ttl is not None
+                    and time.monotonic() >= next_compaction
+                ):
+                    next_compaction = time.monotonic() + self.compact_interval
+                    self._compact(connection)
+        finally:
+            connection.close()
+
+    def _commit(self, connection: sqlite3.Connection, batch: list) -> None:
+        if not batch:
+            return
+        try:
+            with connection:
+                connection.execute("BEGIN IMMEDIATE")
+                connection.executemany(
+                    "INSERT OR REPLACE INTO links"
+                    " (base_site, account, link, alias, short_link, created_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    [
+                        (*key, short_link, created_at)
+                        for key, short_link, created_at in batch
+                    ],
+                )
+        except sqlite3.Error:
+            # It is only a cache, losing a batch costs some requests later.
+            self.write_errors += 1
+            logger.exception("Could not write %d links to %s", len(batch), self.path)
+        else:
+            self.writes += len(batch)
+            self.batches += 1
+        with self._lock:
+            for key, short_link, _ in batch:
+                if self._pending.get(key) == short_link:
+                    del self._pending[key]
+
+    def _compact(self, connection: sqlite3.Connection) -> int:
+        try:
+            deleted = connection.execute(
+                "DELETE FROM links WHERE created_at <= ?", (self._cutoff(),)
+            ).rowcount
+            connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        except sqlite3.Error:
+            logger.exception("Could not compact %s", self.path)
+            return 0
+        self.compacted += deleted
+        return deleted
+
+    async def compact(self) -> int:
+        """
+        It deletes the expired links now, instead of waiting for the next periodic
+        compaction.
+
+        :return: The number of links deleted.
+        """
+        if self.ttl is None:
+            return 0
+        await self.flush()
+
+        return await asyncio.get_running_loop().run_in_executor(
+            self._readers, lambda: self._compact(self._reader())
+        )
+
+    def stats(self) -> dict:
+        """
+        It returns a snapshot of the store counters.
+        """
+        return {
+            "path": self.path,
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "batches": self.batches,
+            "pending": len(self._pending),
+            "write_errors": self.write_errors,
+            "compacted": self.compacted,
+        }
+
+    async def close(self) -> None:
+        """
+        It commits the queued links and stops the background threads.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._writer.join)
+        self._readers.shutdown(wait=True)
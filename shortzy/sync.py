@@ -0,0 +1,226 @@
+import asyncio
+import concurrent.futures
+import threading
+
+from .main import Shortzy
+
+
+class SyncShortzy:
+    """
+    A blocking front for :class:`Shortzy`, for Flask handlers, Celery tasks and scripts.
+
+    One background thread runs an event loop with a single :class:`Shortzy` (and
+    its connection pool) for the lifetime of the instance. Any number of threads
+    can share it; every call is handed to that loop. The ``submit_*`` methods
+    return a :class:`concurrent.futures.Future` instead of blocking.
+
+    Takes the same arguments as :class:`Shortzy`.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.shortzy = Shortzy(*args, **kwargs)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._run, name="shortzy-event-loop", daemon=True
+        )
+        self._closed = False
+        self._lock = threading.Lock()
+        self._thread.start()
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    def _submit(self, coro):
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError(
+                "SyncShortzy can't be called from its own event loop, use Shortzy instead"
+            )
+        # Checked and scheduled under the lock, so nothing lands on a loop that
+        # close() is stopping.
+        with self._lock:
+            if self._closed:
+                coro.close()
+                raise RuntimeError("SyncShortzy is closed")
+            return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    @staticmethod
+    def _wait(future: concurrent.futures.Future, timeout: float):
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            # Nobody is waiting for it anymore.
+            future.cancel()
+            raise
+
+    def submit_convert(
+        self,
+        link: str,
+        silently_fail: bool = False,
+        quick_link: bool = False,
+        alias: str = "",
+        **kwargs
+    ):
+        """
+        It converts a link to a short link in the background.
+
+        :return: A :class:`concurrent.futures.Future` of the short link.
+        """
+        return self._submit(
+            self.shortzy.convert(
+                link,
+                silently_fail=silently_fail,
+                quick_link=quick_link,
+                alias=alias,
+                **kwargs,
+            )
+        )
+
+    def submit_bulk_convert(
+        self, links: list, silently_fail: bool = False, quick_link: bool = False, **kwargs
+    ):
+        """
+        It converts a list of links in the background.
+
+        :return: A :class:`concurrent.futures.Future` of the list of short links.
+        """
+        return self._submit(
+            self.shortzy.bulk_convert(
+                links, silently_fail=silently_fail, quick_link=quick_link, **kwargs
+            )
+        )
+
+    def submit_convert_from_text(
+        self, text: str, silently_fail: bool = False, quick_link: bool = False, **kwargs
+    ):
+        """
+        It converts all links in a text in the background.
+
+        :return: A :class:`concurrent.futures.Future` of the converted text.
+        """
+        return self._submit(
+            self.shortzy.convert_from_text(
+                text, silently_fail=silently_fail, quick_link=quick_link, **kwargs
+            )
+        )
+
+    def convert(
+        self,
+        link: str,
+        silently_fail: bool = False,
+        quick_link: bool = False,
+        alias: str = "",
+        timeout: float = None,
+        **kwargs
+    ) -> str:
+        """
+        It converts a link to a short link, blocking until done.
+
+        :param timeout: Seconds to wait for the result, defaults to None (forever)
+        :type timeout: float (optional)
+
+        :return: The shortened link is being returned.
+        """
+        return self._wait(
+            self.submit_convert(
+                link,
+                silently_fail=silently_fail,
+                quick_link=quick_link,
+                alias=alias,
+                **kwargs,
+            ),
+            timeout,
+        )
+
+    def bulk_convert(
+        self,
+        links: list,
+        silently_fail: bool = False,
+        quick_link: bool = False,
+        timeout: float = None,
+        **kwargs
+    ) -> list:
+        """
+        It converts a list of links to a list of short links, blocking until done.
+
+        :return: The list of shortened links is being returned.
+        """
+        return self._wait(
+            self.submit_bulk_convert(
+                links, silently_fail=silently_fail, quick_link=quick_link, **kwargs
+            ),
+            timeout,
+        )
+
+    def convert_from_text(
+        self,
+        text: str,
+        silently_fail: bool = False,
+        quick_link: bool = False,
+        timeout: float = None,
+        **kwargs
+    ) -> str:
+        """
+        It converts all links from a text to short links, blocking until done.
+
+        :return: The converted text is being returned.
+        """
+        return self._wait(
+            self.submit_convert_from_text(
+                text, silently_fail=silently_fail, quick_link=quick_link, **kwargs
+            ),
+            timeout,
+        )
+
+    def get_quick_link(self, link: str, alias: str = "") -> str:
+        return self._submit(self.shortzy.get_quick_link(link, alias)).result()
+
+    def quick_links(self, links, alias: str = "") -> list:
+        return self.shortzy.quick_links(links, alias)
+
+    def is_short_link(self, link: str) -> bool:
+        return self._submit(self.shortzy.is_short_link(link)).result()
+
+    def stats(self) -> dict:
+        async def snapshot():
+            return self.shortzy.stats()
+
+        return self._submit(snapshot()).result()
+
+    def close(self, timeout: float = None) -> None:
+        """
+        It waits for the calls still running (up to ``timeout`` seconds, then
+        cancels them), closes the connection pool and stops the background loop.
+        """
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("SyncShortzy can't be closed from its own event loop")
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        shutdown = asyncio.run_coroutine_threadsafe(self._shutdown(timeout), self._loop)
+        try:
+            shutdown.result()
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout)
+        if not self._thread.is_alive():
+            self._loop.close()
+
+    async def _shutdown(self, timeout: float) -> None:
+        current = asyncio.current_task()
+        pending = [task for task in asyncio.all_tasks() if task is not current]
+        if pending:
+            _, unfinished = await asyncio.wait(pending, timeout=timeout)
+            for task in unfinished:
+                task.cancel()
+            if unfinished:
+                await asyncio.wait(unfinished)
+        await self.shortzy.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,93 @@
+import asyncio
+import threading
+
+import pytest
+from aiohttp import web
+
+from shortzy.base import BaseShortener
+from shortzy.exceptions import TransientError
+
+
+class FakeShortener(BaseShortener):
+    """
+    A backend answering without any network, recording the links it was asked
+    for. Links listed in ``gates`` wait until their event is set.
+    """
+
+    def __init__(self, api_key: str = "key", base_site: str = "short.test", **kwargs):
+        super().__init__(api_key, base_site, **kwargs)
+        self.calls = []
+        self.gates = {}
+        self.failures = set()
+        self.delay = 0
+
+    def gate(self, link: str) -> asyncio.Event:
+        event = self.gates[link] = asyncio.Event()
+        return event
+
+    async def _shorten(self, link: str, alias: str = "") -> str:
+        self.calls.append(link)
+        gate = self.gates.get(link)
+        if gate is not None:
+            await gate.wait()
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if link in self.failures:
+            raise TransientError(f"{link} failed")
+        return f"https://short.test/{len(self.calls)}"
+
+
+@pytest.fixture
+def make_shortener():
+    return FakeShortener
+
+
+class ApiServer:
+    """
+    An Adlinkfly-style API served from its own thread, so that it outlives the
+    event loops of the tests. ``requests`` lists the URLs it shortened, setting
+    ``body`` makes it answer that instead.
+    """
+
+    def __init__(self):
+        self.requests = []
+        self.body = None
+        self.url = None
+        self._runner = None
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+
+    async def _handle(self, request):
+        url = request.query["url"]
+        self.requests.append(url)
+        if self.body is not None:
+            return web.Response(text=self.body, content_type="application/json")
+        return web.json_response(
+            {"status": "success", "shortenedUrl": "https://short.test/" + url.rsplit("/", 1)[-1]}
+        )
+
+    async def _start(self):
+        app = web.Application()
+        app.router.add_get("/api", self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, "127.0.0.1", 0).start()
+        self.url = f"http://127.0.0.1:{self._runner.addresses[0][1]}/api"
+
+    def start(self) -> None:
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._start(), self._loop).result(5)
+
+    def stop(self) -> None:
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result(5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(5)
+        self._loop.close()
+
+
+@pytest.fixture
+def api_server():
+    server = ApiServer()
+    server.start()
+    yield server
+    server.stop()
@@ -0,0 +1,47 @@
+import asyncio
+
+from shortzy import LinkCache
+
+
+def test_least_recently_used_links_are_evicted():
+    cache = LinkCache(maxsize=2)
+    cache.set("a", "https://short.test/a")
+    cache.set("b", "https://short.test/b")
+    assert cache.get("a") == "https://short.test/a"
+    cache.set("c", "https://short.test/c")
+
+    assert cache.get("b") is None
+    assert cache.get("a") and cache.get("c")
+    assert cache.stats()["evictions"] == 1
+
+
+def test_links_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("shortzy.cache.time.monotonic", lambda: now[0])
+    cache = LinkCache(ttl=10)
+    cache.set("a", "https://short.test/a")
+
+    now[0] += 9
+    assert cache.get("a") == "https://short.test/a"
+    now[0] += 1
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_cached_links_skip_the_request(make_shortener):
+    cache = LinkCache()
+    shortener = make_shortener(cache=cache)
+    other_account = make_shortener(api_key="other", cache=cache)
+
+    async def main():
+        first = await shortener.convert("https://example.com/1")
+        again = await shortener.convert("https://example.com/1")
+        aliased = await shortener.convert("https://example.com/1", alias="custom")
+        other = await other_account.convert("https://example.com/1")
+        return first, again, aliased, other
+
+    first, again, aliased, other = asyncio.run(main())
+    assert first == again != aliased
+    assert shortener.calls == ["https://example.com/1"] * 2
+    assert other_account.calls == ["https://example.com/1"]
+    assert cache.hits == 1
@@ -0,0 +1,72 @@
+import json
+
+import pytest
+
+from shortzy import cli
+
+
+@pytest.fixture
+def run_cli(api_server, monkeypatch, tmp_path):
+    init_worker = cli._init_worker
+
+    def init_local_worker(options):
+        init_worker(options)
+        cli._worker[1].shortener.base_url = api_server.url
+
+    monkeypatch.setattr(cli, "_init_worker", init_local_worker)
+    source = tmp_path / "links.txt"
+    source.write_text("".join(f"https://example.com/{i}\n" for i in range(5)))
+    output = tmp_path / "out.jsonl"
+
+    def run(*extra):
+        argv = [str(source), "-o", str(output), "-k", "key", "-w", "0", "-b", "2", "--no-count"]
+        return cli.main(argv + list(extra))
+
+    run.output = output
+    return run
+
+
+def _rows(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_interrupted_run_resumes_where_it_stopped(run_cli, api_server, monkeypatch):
+    shorten_batch = cli._shorten_batch
+
+    def interrupt_second_batch(batch_id, batch):
+        if batch_id == 1:
+            raise KeyboardInterrupt
+        return shorten_batch(batch_id, batch)
+
+    monkeypatch.setattr(cli, "_shorten_batch", interrupt_second_batch)
+    assert run_cli() == 130
+    assert [row["row"] for row in _rows(run_cli.output)] == [0, 1]
+
+    monkeypatch.setattr(cli, "_shorten_batch", shorten_batch)
+    assert run_cli() == 0
+
+    rows = _rows(run_cli.output)
+    assert [row["row"] for row in rows] == [0, 1, 2, 3, 4]
+    assert rows[4]["short_url"] == "https://short.test/4"
+    assert sorted(api_server.requests) == [f"https://example.com/{i}" for i in range(5)]
+
+
+def test_checkpoint_counts_rows_of_a_partial_batch(run_cli):
+    assert run_cli() == 0
+
+    path = str(run_cli.output) + ".checkpoint"
+    with open(path) as f:
+        settings = json.loads(f.readline())
+    checkpoint = cli.Checkpoint(path, settings)
+    assert checkpoint.load()
+    assert checkpoint.done == {0, 1, 2}
+    assert checkpoint.rows == 5
+
+
+@pytest.mark.parametrize(
+    "other", [["-k", "other-key"], ["-s", "other.test"], ["--quick-link"]]
+)
+def test_checkpoint_refuses_other_settings(run_cli, other):
+    assert run_cli() == 0
+    with pytest.raises(SystemExit, match="other settings"):
+        run_cli(*other)
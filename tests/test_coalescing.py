@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+
+from shortzy.exceptions import TransientError
+
+LINK = "https://example.com/1"
+
+
+def test_concurrent_duplicates_share_one_request(make_shortener):
+    shortener = make_shortener()
+
+    async def main():
+        gate = shortener.gate(LINK)
+        callers = [asyncio.ensure_future(shortener.convert(LINK)) for _ in range(5)]
+        await asyncio.sleep(0)
+        gate.set()
+        return await asyncio.gather(*callers)
+
+    results = asyncio.run(main())
+    assert len(set(results)) == 1
+    assert shortener.calls == [LINK]
+    assert shortener.coalesced_requests == 4
+
+
+def test_aliases_are_not_coalesced(make_shortener):
+    shortener = make_shortener()
+
+    async def main():
+        return await asyncio.gather(
+            shortener.convert(LINK), shortener.convert(LINK, alias="custom")
+        )
+
+    first, aliased = asyncio.run(main())
+    assert first != aliased
+    assert len(shortener.calls) == 2
+
+
+def test_failure_reaches_every_caller(make_shortener):
+    shortener = make_shortener()
+    shortener.failures.add(LINK)
+
+    async def main():
+        return await asyncio.gather(
+            shortener.convert(LINK), shortener.convert(LINK), return_exceptions=True
+        )
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, TransientError) for result in results)
+    assert shortener.calls == [LINK]
+
+
+def test_cancelling_one_caller_leaves_the_others(make_shortener):
+    shortener = make_shortener()
+
+    async def main():
+        gate = shortener.gate(LINK)
+        cancelled = asyncio.ensure_future(shortener.convert(LINK))
+        waiting = asyncio.ensure_future(shortener.convert(LINK))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await asyncio.sleep(0)
+        gate.set()
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        return await waiting
+
+    assert asyncio.run(main()).startswith("https://short.test/")
+    assert shortener.calls == [LINK]
+
+
+def test_request_is_cancelled_with_its_last_caller(make_shortener):
+    shortener = make_shortener()
+
+    async def main():
+        shortener.gate(LINK)
+        callers = [asyncio.ensure_future(shortener.convert(LINK)) for _ in range(2)]
+        await asyncio.sleep(0)
+        for caller in callers:
+            caller.cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+        await asyncio.sleep(0)
+        return shortener.stats()["inflight_requests"]
+
+    assert asyncio.run(main()) == 0
@@ -0,0 +1,71 @@
+import asyncio
+import io
+
+
+def test_links_sharing_a_prefix_are_replaced_separately(make_shortener):
+    shortener = make_shortener()
+    text = "see https://a.com/x and https://a.com/x/y, then https://a.com/x again."
+
+    result = asyncio.run(shortener.convert_from_text(text))
+
+    assert shortener.calls == ["https://a.com/x", "https://a.com/x/y"]
+    assert result == (
+        "see https://short.test/1 and https://short.test/2, then https://short.test/1 again."
+    )
+
+
+def test_short_links_and_failures_are_kept(make_shortener):
+    shortener = make_shortener()
+    shortener.failures.add("https://a.com/down")
+    text = "https://short.test/old https://a.com/down https://a.com/up"
+
+    result = asyncio.run(shortener.convert_from_text(text))
+
+    assert result == "https://short.test/old https://a.com/down https://short.test/2"
+
+
+def test_text_without_links_is_returned_as_is(make_shortener):
+    shortener = make_shortener()
+    assert asyncio.run(shortener.convert_from_text("nothing to see")) == "nothing to see"
+    assert shortener.calls == []
+
+
+def _stream(shortener, chunks, **kwargs):
+    async def main():
+        return "".join(
+            [part async for part in shortener.iter_convert_from_text(chunks, **kwargs)]
+        )
+
+    return asyncio.run(main())
+
+
+def test_links_split_across_chunks_are_shortened(make_shortener):
+    shortener = make_shortener()
+    chunks = ["first https://a.com/lo", "ng/path and", " https://b.com/x\nend"]
+
+    result = _stream(shortener, chunks)
+
+    assert shortener.calls == ["https://a.com/long/path", "https://b.com/x"]
+    assert result == "first https://short.test/1 and https://short.test/2\nend"
+
+
+def test_file_objects_are_read_in_chunks(make_shortener):
+    shortener = make_shortener()
+    text = "".join(f"line {i} https://a.com/{i}\n" for i in range(50))
+
+    result = _stream(shortener, io.StringIO(text), chunk_size=7, max_concurrency=2)
+
+    assert len(shortener.calls) == 50
+    assert result.count("https://short.test/") == 50
+    assert result.splitlines()[0].startswith("line 0 https://short.test/")
+
+
+def test_overlong_tokens_pass_through(make_shortener):
+    shortener = make_shortener()
+    token = "x" * 50 + ".com/" + "y" * 50
+    chunks = [token[:40], token[40:], " https://a.com/1"]
+
+    result = _stream(shortener, chunks, max_token_size=64)
+
+    assert result == token + " https://short.test/1"
+    assert shortener.calls == ["https://a.com/1"]
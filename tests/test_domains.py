@@ -0,0 +1,50 @@
+import asyncio
+
+import pytest
+
+from shortzy.domains import ShortLinkIndex
+
+
+@pytest.mark.parametrize(
+    "link, short",
+    [
+        ("https://droplink.co/abc", True),
+        ("https://www.droplink.co/abc", True),
+        ("droplink.co/abc", True),
+        ("https://DROPLINK.CO./abc", True),
+        ("https://user@droplink.co:443/abc", True),
+        ("https://notdroplink.co.evil.com/abc", False),
+        ("https://droplink.co.evil.com/abc", False),
+        ("https://notdroplink.co/abc", False),
+        ("https://evil.com/?u=droplink.co", False),
+        ("https://droplink.co@evil.com/abc", False),
+    ],
+)
+def test_only_the_domain_and_its_subdomains_match(link, short):
+    assert ShortLinkIndex(["droplink.co"]).is_short_link(link) is short
+
+
+def test_domains_are_normalized():
+    index = ShortLinkIndex(["https://GPLinks.in/path", "*.shareus.io", "za.gl."])
+    assert set(index) == {"gplinks.in", "shareus.io", "za.gl"}
+
+
+def test_parent_domains_added_later_count():
+    parent = ShortLinkIndex()
+    index = ShortLinkIndex(["droplink.co"], parent=parent)
+    assert not index.is_short_link("https://tnlink.in/abc")
+
+    parent.add("tnlink.in")
+    assert index.is_short_link("https://tnlink.in/abc")
+    parent.discard("tnlink.in")
+    assert not index.is_short_link("https://tnlink.in/abc")
+
+
+def test_short_links_of_other_providers_skip_the_request(make_shortener):
+    shortener = make_shortener(short_link_domains=["tnlink.in"])
+    links = ["https://tnlink.in/abc", "https://gplinks.in/abc", "https://example.com"]
+
+    results = asyncio.run(shortener.bulk_convert(links))
+
+    assert results[:2] == links[:2]
+    assert shortener.calls == ["https://example.com"]
@@ -0,0 +1,33 @@
+from shortzy.extractor import extract_url_spans, extract_urls, replace_spans
+
+
+def test_links_with_and_without_scheme():
+    text = "(example.com/path) user@mail.com www.test.org/a?b=1&c=2#f, https://a.com/x."
+
+    assert extract_urls(text) == [
+        "example.com/path",
+        "www.test.org/a?b=1&c=2#f",
+        "https://a.com/x",
+    ]
+
+
+def test_text_without_links():
+    assert extract_url_spans("") == []
+    assert extract_url_spans("no links here") == []
+    assert extract_urls("version 1.2 of the notes") == []
+
+
+def test_spans_point_at_the_links():
+    text = "go to https://a.com/x now"
+    (start, end), = extract_url_spans(text)
+    assert text[start:end] == "https://a.com/x"
+
+
+def test_replace_spans_keeps_links_without_replacement():
+    text = "https://a.com/x https://a.com/x/y https://b.com"
+    spans = extract_url_spans(text)
+
+    assert replace_spans(text, spans, {"https://a.com/x": "S"}) == (
+        "S https://a.com/x/y https://b.com"
+    )
+    assert replace_spans(text, spans, {}) == text
@@ -0,0 +1,46 @@
+import asyncio
+
+import aiohttp
+from aiohttp import web
+
+from shortzy import Instrumentation
+
+
+async def _serve():
+    async def handler(request):
+        return web.json_response({"status": "success", "shortenedUrl": "https://s.test/a"})
+
+    app = web.Application()
+    app.router.add_get("/api", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    return runner, f"http://127.0.0.1:{port}/api"
+
+
+def test_bytes_sent_counts_the_request_head():
+    async def main():
+        runner, url = await _serve()
+        instrumentation = Instrumentation()
+        try:
+            async with aiohttp.ClientSession(
+                trace_configs=[instrumentation.trace_config]
+            ) as session:
+                with instrumentation.trace("s.test") as trace:
+                    async with session.get(
+                        url, params={"url": "https://example.com"}, trace_request_ctx=trace
+                    ) as response:
+                        await response.json()
+        finally:
+            await runner.cleanup()
+        return instrumentation, trace
+
+    instrumentation, trace = asyncio.run(main())
+
+    assert trace.ok and trace.status == 200
+    assert trace.bytes_sent > len("GET /api?url=https://example.com HTTP/1.1\r\n")
+    assert trace.bytes_received > 0
+    assert instrumentation.snapshot()["bytes_sent"] == trace.bytes_sent
+    assert "wait" in trace.phases
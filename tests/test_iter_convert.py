@@ -0,0 +1,81 @@
+import asyncio
+
+from shortzy.exceptions import TransientError
+
+
+def _links(count):
+    return [f"https://example.com/{i}" for i in range(count)]
+
+
+def test_links_are_pulled_lazily_within_the_limit(make_shortener):
+    shortener = make_shortener()
+    shortener.delay = 0.01
+    pulled = []
+
+    def source():
+        for link in _links(10):
+            pulled.append(link)
+            yield link
+
+    async def main():
+        seen = []
+        async for index, url, result in shortener.iter_convert(source(), max_concurrency=3):
+            # Never more links taken from the input than results out plus in flight.
+            assert len(pulled) <= len(seen) + 1 + 3
+            seen.append((index, url, result))
+        return seen
+
+    results = asyncio.run(main())
+    assert sorted(index for index, _, _ in results) == list(range(10))
+    assert all(url == _links(10)[index] for index, url, _ in results)
+
+
+def test_results_are_yielded_as_they_complete(make_shortener):
+    shortener = make_shortener()
+
+    async def main():
+        slow = shortener.gate("https://example.com/0")
+        order = []
+        async for index, _, _ in shortener.iter_convert(_links(3)):
+            order.append(index)
+            if len(order) == 2:
+                slow.set()
+        return order
+
+    order = asyncio.run(main())
+    assert sorted(order[:2]) == [1, 2] and order[2] == 0
+
+
+def test_failures_are_yielded_or_kept(make_shortener):
+    shortener = make_shortener()
+    shortener.failures.add("https://example.com/1")
+
+    async def main():
+        failed = [
+            result
+            async for _, _, result in shortener.iter_convert(_links(3), silently_fail=False)
+            if isinstance(result, BaseException)
+        ]
+        kept = await shortener.bulk_convert(_links(3))
+        return failed, kept
+
+    failed, kept = asyncio.run(main())
+    assert len(failed) == 1 and isinstance(failed[0], TransientError)
+    assert kept[1] == "https://example.com/1"
+    assert kept[0].startswith("https://short.test/")
+
+
+def test_async_input_and_short_links(make_shortener):
+    shortener = make_shortener()
+
+    async def source():
+        yield "https://example.com/a"
+        yield "https://short.test/already"
+
+    async def main():
+        return [result async for _, _, result in shortener.iter_convert(source())]
+
+    results = asyncio.run(main())
+    assert "https://short.test/already" in results
+    assert shortener.calls == ["https://example.com/a"]
+
@@ -0,0 +1,88 @@
+import asyncio
+
+from shortzy.exceptions import TransientError
+from shortzy.multi import MultiShortener, ProviderHealth
+
+
+def _providers(make_shortener, *delays):
+    shorteners = []
+    for index, delay in enumerate(delays):
+        shortener = make_shortener(f"key-{index}", f"site{index}.test")
+        shortener.delay = delay
+        shorteners.append(shortener)
+    return shorteners
+
+
+def test_links_go_to_the_fastest_provider(make_shortener):
+    async def main():
+        slow, fast = _providers(make_shortener, 0.05, 0.001)
+        multi = MultiShortener([slow, fast], explore=0)
+        for i in range(30):
+            await multi.convert(f"https://example.com/{i}")
+        return len(slow.calls), len(fast.calls)
+
+    slow_calls, fast_calls = asyncio.run(main())
+    assert slow_calls <= 2
+    assert fast_calls >= 28
+
+
+def test_losing_hedged_request_counts_as_a_latency_sample(make_shortener):
+    async def main():
+        slow, fast = _providers(make_shortener, 0.3, 0.01)
+        multi = MultiShortener([slow, fast], hedge=True, hedge_delay=0.05, explore=0)
+        for i in range(10):
+            await multi.convert(f"https://example.com/{i}")
+        return multi.stats(), len(slow.calls)
+
+    stats, slow_calls = asyncio.run(main())
+    slow_stats = stats["providers"][0]
+    assert slow_stats["requests"] >= 1
+    assert slow_stats["latency_ms"] >= 40
+    assert slow_calls == 1
+    assert stats["hedged_requests"] == 1
+
+
+def test_hedge_wins_when_the_primary_fails(make_shortener):
+    async def main():
+        first, second = _providers(make_shortener, 0, 0)
+        first.failures.add("https://example.com/x")
+        multi = MultiShortener([first, second], hedge=True, explore=0)
+        return await multi.convert("https://example.com/x")
+
+    assert asyncio.run(main()).startswith("https://short.test/")
+
+
+def test_exploration_refreshes_the_other_providers(make_shortener):
+    async def main():
+        slow, fast = _providers(make_shortener, 0.01, 0.001)
+        multi = MultiShortener([slow, fast], explore=0.5)
+        await multi.bulk_convert([f"https://example.com/{i}" for i in range(100)])
+        return len(slow.calls), multi.stats()["explored_requests"]
+
+    slow_calls, explored = asyncio.run(main())
+    assert slow_calls >= 10
+    assert explored >= 10
+
+
+def test_error_rate_decays_while_a_provider_gets_no_traffic(make_shortener):
+    health = ProviderHealth(make_shortener(), recovery_half_life=0.01)
+    for _ in range(5):
+        health.record(0.01, ok=False)
+    assert not health.healthy
+    asyncio.run(asyncio.sleep(0.05))
+    assert health.healthy
+
+
+def test_failing_provider_is_ranked_last(make_shortener):
+    async def main():
+        broken, working = _providers(make_shortener, 0, 0)
+        broken.failures.update(f"https://example.com/{i}" for i in range(5))
+        multi = MultiShortener([broken, working], explore=0)
+        results = await multi.bulk_convert(
+            [f"https://example.com/{i}" for i in range(5)], silently_fail=False
+        )
+        return multi.ranked()[0].shortener is working, results
+
+    working_first, results = asyncio.run(main())
+    assert working_first
+    assert any(isinstance(result, TransientError) for result in results)
@@ -0,0 +1,38 @@
+from importlib import metadata
+
+import pytest
+
+from shortzy.adlinkfly import Adlinkfly
+from shortzy.providers import ENTRY_POINT_GROUP, ProviderRegistry
+
+
+def _entry_point(name, value):
+    return metadata.EntryPoint(name=name, value=value, group=ENTRY_POINT_GROUP)
+
+
+@pytest.fixture
+def installed(monkeypatch):
+    entry_points = []
+    monkeypatch.setattr(metadata, "entry_points", lambda **kwargs: list(entry_points))
+    return entry_points
+
+
+def test_sites_resolve_exactly_then_by_pattern():
+    registry = ProviderRegistry(default="shortzy.adlinkfly:Adlinkfly")
+    registry.register("exact.provider.test", int)
+    registry.register("*.provider.test", float)
+
+    assert registry.resolve("Exact.Provider.Test") is int
+    assert registry.resolve("api.provider.test") is float
+    assert registry.resolve("other.test") is Adlinkfly
+
+
+def test_entry_points_are_loaded_on_first_resolve(installed):
+    installed.append(_entry_point("lazy.provider.test", "missing_package.backend:Backend"))
+    installed.append(_entry_point("extras.provider.test", "shortzy.adlinkfly:Adlinkfly [fast]"))
+    registry = ProviderRegistry(default=int)
+
+    assert "lazy.provider.test" in registry.available_websites()
+    assert registry.resolve("extras.provider.test") is Adlinkfly
+    with pytest.raises(ModuleNotFoundError):
+        registry.resolve("lazy.provider.test")
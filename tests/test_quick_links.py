@@ -0,0 +1,52 @@
+import asyncio
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from shortzy import Shortzy
+
+LINKS = [
+    "https://example.com/watch?v=1&list=2#t",
+    "https://example.com/a b/%41",
+    "https://例え.jp/パス",
+]
+
+
+def _query(quick_link):
+    return parse_qs(urlsplit(quick_link).query)
+
+
+@pytest.mark.parametrize(
+    "site, field", [("droplink.co", "url"), ("shareus.in", "link"), ("shareus.io", "link")]
+)
+def test_links_survive_the_query_string(site, field):
+    shortzy = Shortzy("k&y", base_site=site)
+
+    for link, quick_link in zip(LINKS, shortzy.quick_links(LINKS)):
+        assert _query(quick_link)[field] == [link]
+
+
+def test_api_key_and_alias_are_encoded():
+    shortzy = Shortzy("k&y=1", base_site="droplink.co")
+    query = _query(shortzy.quick_links(LINKS[:1], alias="a b&c")[0])
+
+    assert query["api"] == ["k&y=1"]
+    assert query["alias"] == ["a b&c"]
+
+
+def test_short_links_are_kept():
+    shortzy = Shortzy("key", base_site="droplink.co")
+    assert shortzy.quick_links(["https://droplink.co/abc"]) == ["https://droplink.co/abc"]
+
+
+def test_quick_links_match_the_async_paths():
+    shortzy = Shortzy("key", base_site="droplink.co")
+
+    async def main():
+        single = await shortzy.get_quick_link(LINKS[0])
+        bulk = await shortzy.bulk_convert(LINKS, quick_link=True)
+        return single, bulk
+
+    single, bulk = asyncio.run(main())
+    assert bulk == shortzy.quick_links(LINKS)
+    assert single == bulk[0]
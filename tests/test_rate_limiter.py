@@ -0,0 +1,144 @@
+import asyncio
+import time
+
+import pytest
+
+from shortzy.exceptions import RateLimitError, TransientError
+from shortzy.resilience import RateLimiter
+
+
+def test_failure_halves_the_limit():
+    async def main():
+        limiter = RateLimiter("example.com", initial_concurrency=8)
+        ticket = await limiter.acquire()
+        limiter.release(ticket, error=TransientError("timeout"))
+        return limiter
+
+    limiter = asyncio.run(main())
+    assert limiter.limit == 4
+    assert limiter.decreases == 1
+    assert limiter.in_flight == 0
+
+
+def test_failures_sent_before_a_decrease_do_not_shrink_it_again():
+    async def main():
+        limiter = RateLimiter("example.com", initial_concurrency=8)
+        tickets = [await limiter.acquire() for _ in range(4)]
+        for ticket in tickets:
+            limiter.release(ticket, error=TransientError("timeout"))
+        after_burst = limiter.limit
+        ticket = await limiter.acquire()
+        limiter.release(ticket, error=TransientError("timeout"))
+        return after_burst, limiter.limit, limiter.decreases
+
+    after_burst, limit, decreases = asyncio.run(main())
+    assert after_burst == 4
+    assert limit == 2
+    assert decreases == 2
+
+
+def test_limit_never_goes_below_the_minimum():
+    async def main():
+        limiter = RateLimiter("example.com", initial_concurrency=2, min_concurrency=2)
+        for _ in range(3):
+            ticket = await limiter.acquire()
+            limiter.release(ticket, error=TransientError("timeout"))
+        return limiter.limit
+
+    assert asyncio.run(main()) == 2
+
+
+def test_successes_grow_the_limit_additively():
+    async def main():
+        limiter = RateLimiter("example.com", initial_concurrency=4, max_concurrency=5)
+        for _ in range(4):
+            ticket = await limiter.acquire()
+            limiter.release(ticket, latency=0.01)
+        grown = limiter.limit
+        for _ in range(50):
+            ticket = await limiter.acquire()
+            limiter.release(ticket, latency=0.01)
+        return grown, limiter.limit
+
+    grown, capped = asyncio.run(main())
+    assert 4.9 < grown < 5.0
+    assert capped == 5
+
+
+def test_rising_latency_backs_off():
+    async def main():
+        limiter = RateLimiter("example.com", initial_concurrency=8, latency_tolerance=2)
+        for _ in range(10):
+            ticket = await limiter.acquire()
+            limiter.release(ticket, latency=0.01)
+        before = limiter.limit
+        for _ in range(10):
+            ticket = await limiter.acquire()
+            limiter.release(ticket, latency=0.1)
+        return before, limiter.limit, limiter.decreases
+
+    before, after, decreases = asyncio.run(main())
+    assert decreases >= 1
+    assert after < before
+
+
+def test_requests_beyond_the_limit_wait_for_a_slot():
+    async def main():
+        limiter = RateLimiter("example.com", initial_concurrency=2, max_concurrency=2)
+        tickets = [await limiter.acquire(), await limiter.acquire()]
+        third = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0.01)
+        waited = not third.done()
+        limiter.release(tickets[0], latency=0.01)
+        await asyncio.wait_for(third, 1)
+        return waited, limiter.in_flight
+
+    waited, in_flight = asyncio.run(main())
+    assert waited
+    assert in_flight == 2
+
+
+def test_cancelled_waiter_gives_its_slot_back():
+    async def main():
+        limiter = RateLimiter("example.com", initial_concurrency=1, max_concurrency=1)
+        ticket = await limiter.acquire()
+        waiter = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        limiter.release(ticket, latency=0.01)
+        return limiter.stats()
+
+    stats = asyncio.run(main())
+    assert stats["in_flight"] == 0
+    assert stats["waiting"] == 0
+
+
+def test_retry_after_holds_back_requests():
+    async def main():
+        limiter = RateLimiter("example.com")
+        ticket = await limiter.acquire()
+        limiter.release(ticket, error=RateLimitError("slow down", retry_after=0.1))
+        start = time.monotonic()
+        ticket = await limiter.acquire()
+        limiter.release(ticket, latency=0.01)
+        return time.monotonic() - start
+
+    assert asyncio.run(main()) >= 0.09
+
+
+def test_token_bucket_caps_the_rate():
+    async def main():
+        limiter = RateLimiter("example.com", rate=100, burst=1, max_concurrency=10)
+        start = time.monotonic()
+        for _ in range(6):
+            ticket = await limiter.acquire()
+            limiter.release(ticket, latency=0.001)
+        return time.monotonic() - start
+
+    assert asyncio.run(main()) >= 0.045
+
+
+def test_for_site_shares_one_limiter():
+    assert RateLimiter.for_site("shared.example") is RateLimiter.for_site("shared.example")
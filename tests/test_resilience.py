@@ -0,0 +1,93 @@
+import asyncio
+
+import aiohttp
+import pytest
+
+from shortzy import (
+    CircuitBreaker,
+    CircuitOpenError,
+    InvalidResponseError,
+    RateLimitError,
+    RetryPolicy,
+    ShortenerAPIError,
+    Shortzy,
+    TransientError,
+)
+from shortzy.resilience import classify_error
+
+
+def _response_error(status, headers=None):
+    return aiohttp.ClientResponseError(
+        request_info=None, history=(), status=status, message="error", headers=headers
+    )
+
+
+def test_classify_error():
+    rate_limited = classify_error(_response_error(429, {"Retry-After": "7"}))
+    assert isinstance(rate_limited, RateLimitError) and rate_limited.retry_after == 7
+    assert type(classify_error(_response_error(503))) is TransientError
+    assert type(classify_error(_response_error(404))) is ShortenerAPIError
+    assert type(classify_error(asyncio.TimeoutError())) is TransientError
+    assert not isinstance(classify_error(KeyError("status")), InvalidResponseError)
+
+
+@pytest.mark.parametrize(
+    "body, error",
+    [
+        ("<html>maintenance</html>", InvalidResponseError),
+        ('{"status": "success"}', InvalidResponseError),
+        ('{"status": "error", "message": "Invalid API key"}', ShortenerAPIError),
+    ],
+)
+def test_unexpected_answers(api_server, body, error):
+    api_server.body = body
+    shortzy = Shortzy("key", base_site="short.test")
+    shortzy.shortener.base_url = api_server.url
+
+    async def main():
+        async with shortzy:
+            await shortzy.convert("https://example.com/1")
+
+    with pytest.raises(error):
+        asyncio.run(main())
+
+
+def test_bugs_are_not_reported_as_invalid_responses(monkeypatch):
+    shortzy = Shortzy("key", base_site="short.test")
+
+    async def broken_session():
+        raise KeyError("bug")
+
+    monkeypatch.setattr(shortzy.shortener, "get_session", broken_session)
+    with pytest.raises(KeyError):
+        asyncio.run(shortzy.convert("https://example.com/1"))
+
+
+def test_transient_failures_are_retried(make_shortener):
+    shortener = make_shortener(retry=RetryPolicy(attempts=3, backoff=0))
+    shortener.failures.add("https://example.com/1")
+
+    with pytest.raises(TransientError):
+        asyncio.run(shortener.convert("https://example.com/1"))
+    assert len(shortener.calls) == 3
+
+
+def test_circuit_breaker_fails_fast_then_probes(make_shortener):
+    breaker = CircuitBreaker("short.test", failure_threshold=2, recovery_timeout=60)
+    shortener = make_shortener(circuit_breaker=breaker)
+    shortener.failures.add("https://example.com/down")
+
+    async def main():
+        for _ in range(2):
+            with pytest.raises(TransientError):
+                await shortener.convert("https://example.com/down")
+        with pytest.raises(CircuitOpenError):
+            await shortener.convert("https://example.com/up")
+        assert len(shortener.calls) == 2
+
+        breaker.recovery_timeout = 0
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert await shortener.convert("https://example.com/up")
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    asyncio.run(main())
@@ -0,0 +1,273 @@
+import asyncio
+
+import pytest
+
+from shortzy.exceptions import DeadlineExceededError, QueueFullError
+from shortzy.scheduler import BULK, INTERACTIVE, Scheduler
+
+
+async def _settle():
+    # Lets submitted links go through the batch window and get dispatched.
+    for _ in range(5):
+        await asyncio.sleep(0.005)
+
+
+async def _blocked(shortener, scheduler):
+    """
+    It occupies the scheduler's only slot until the returned event is set.
+    """
+    release = shortener.gate("https://example.com/blocker")
+    task = asyncio.ensure_future(
+        scheduler.submit(shortener, "https://example.com/blocker")
+    )
+    await _settle()
+    assert shortener.calls == ["https://example.com/blocker"]
+    return release, task
+
+
+def test_interactive_links_go_before_bulk_ones(make_shortener):
+    async def main():
+        shortener = make_shortener()
+        scheduler = Scheduler(concurrency=1, interactive_reserve=0, batch_window=0)
+        release, blocker = await _blocked(shortener, scheduler)
+
+        links = [
+            ("https://example.com/bulk-1", BULK),
+            ("https://example.com/interactive-1", INTERACTIVE),
+            ("https://example.com/bulk-2", BULK),
+            ("https://example.com/interactive-2", INTERACTIVE),
+        ]
+        tasks = [
+            asyncio.ensure_future(scheduler.submit(shortener, link, priority=priority))
+            for link, priority in links
+        ]
+        await _settle()
+        release.set()
+        await asyncio.gather(blocker, *tasks)
+        return shortener.calls[1:]
+
+    assert asyncio.run(main()) == [
+        "https://example.com/interactive-1",
+        "https://example.com/interactive-2",
+        "https://example.com/bulk-1",
+        "https://example.com/bulk-2",
+    ]
+
+
+def test_nearest_deadline_goes_first(make_shortener):
+    async def main():
+        shortener = make_shortener()
+        scheduler = Scheduler(concurrency=1, interactive_reserve=0, batch_window=0)
+        release, blocker = await _blocked(shortener, scheduler)
+
+        tasks = [
+            asyncio.ensure_future(scheduler.submit(shortener, link, deadline=deadline))
+            for link, deadline in (
+                ("https://example.com/later", 10),
+                ("https://example.com/none", None),
+                ("https://example.com/soon", 5),
+            )
+        ]
+        await _settle()
+        release.set()
+        await asyncio.gather(blocker, *tasks)
+        return shortener.calls[1:]
+
+    assert asyncio.run(main()) == [
+        "https://example.com/soon",
+        "https://example.com/later",
+        "https://example.com/none",
+    ]
+
+
+def test_bulk_links_leave_the_reserved_slots_free(make_shortener):
+    async def main():
+        shortener = make_shortener()
+        scheduler = Scheduler(concurrency=2, interactive_reserve=1, batch_window=0)
+        gates = [shortener.gate(f"https://example.com/bulk-{i}") for i in range(2)]
+        bulk = [
+            asyncio.ensure_future(
+                scheduler.submit(shortener, f"https://example.com/bulk-{i}", priority=BULK)
+            )
+            for i in range(2)
+        ]
+        await _settle()
+        running_bulk = scheduler.running
+
+        interactive = await asyncio.wait_for(
+            scheduler.submit(shortener, "https://example.com/interactive"), 1
+        )
+        for gate in gates:
+            gate.set()
+        await asyncio.gather(*bulk)
+        return running_bulk, interactive
+
+    running_bulk, interactive = asyncio.run(main())
+    assert running_bulk == 1
+    assert interactive.startswith("https://short.test/")
+
+
+def test_link_expires_in_the_queue(make_shortener):
+    async def main():
+        shortener = make_shortener()
+        scheduler = Scheduler(concurrency=1, interactive_reserve=0, batch_window=0)
+        release, blocker = await _blocked(shortener, scheduler)
+
+        late = asyncio.ensure_future(
+            scheduler.submit(shortener, "https://example.com/late", deadline=0.01)
+        )
+        await asyncio.sleep(0.05)
+        release.set()
+        await blocker
+        with pytest.raises(DeadlineExceededError):
+            await late
+        return shortener.calls, scheduler.stats()["expired"]
+
+    calls, expired = asyncio.run(main())
+    assert "https://example.com/late" not in calls
+    assert expired == 1
+
+
+def test_full_queue_rejects(make_shortener):
+    async def main():
+        shortener = make_shortener()
+        scheduler = Scheduler(
+            concurrency=1, interactive_reserve=0, max_queue=2, overflow="reject", batch_window=0
+        )
+        release, blocker = await _blocked(shortener, scheduler)
+
+        tasks = [
+            asyncio.ensure_future(scheduler.submit(shortener, f"https://example.com/{i}"))
+            for i in range(3)
+        ]
+        await _settle()
+        release.set()
+        await blocker
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        return results, scheduler.stats()["rejected"]
+
+    results, rejected = asyncio.run(main())
+    assert sum(isinstance(result, QueueFullError) for result in results) == 2
+    assert rejected == 2
+
+
+def test_full_queue_waits_for_room(make_shortener):
+    async def main():
+        shortener = make_shortener()
+        scheduler = Scheduler(concurrency=1, interactive_reserve=0, max_queue=1, batch_window=0)
+        release, blocker = await _blocked(shortener, scheduler)
+
+        waiting = asyncio.ensure_future(scheduler.submit(shortener, "https://example.com/next"))
+        await _settle()
+        queued_early = bool(shortener.calls[1:])
+        release.set()
+        await blocker
+        return queued_early, await waiting
+
+    queued_early, result = asyncio.run(main())
+    assert not queued_early
+    assert result.startswith("https://short.test/")
+
+
+def test_duplicate_links_are_shortened_once(make_shortener):
+    async def main():
+        shortener = make_shortener()
+        scheduler = Scheduler()
+        results = await asyncio.gather(
+            *(scheduler.submit(shortener, "https://example.com/same") for _ in range(5))
+        )
+        return results, shortener.calls, scheduler.stats()["deduplicated"]
+
+    results, calls, deduplicated = asyncio.run(main())
+    assert len(set(results)) == 1
+    assert calls == ["https://example.com/same"]
+    assert deduplicated == 4
+
+
+def test_cancelled_caller_leaves_the_others_served(make_shortener):
+    async def main():
+        shortener = make_shortener()
+        scheduler = Scheduler(concurrency=1, interactive_reserve=0, batch_window=0)
+        release, blocker = await _blocked(shortener, scheduler)
+
+        first = asyncio.ensure_future(scheduler.submit(shortener, "https://example.com/x"))
+        second = asyncio.ensure_future(scheduler.submit(shortener, "https://example.com/x"))
+        await _settle()
+        first.cancel()
+        release.set()
+        await blocker
+        return first, await second
+
+    first, result = asyncio.run(main())
+    assert first.cancelled()
+    assert result.startswith("https://short.test/")
+
+
+def test_link_nobody_waits_for_is_dropped(make_shortener):
+    async def main():
+        shortener = make_shortener()
+        scheduler = Scheduler(concurrency=1, interactive_reserve=0, batch_window=0)
+        release, blocker = await _blocked(shortener, scheduler)
+
+        callers = [
+            asyncio.ensure_future(scheduler.submit(shortener, "https://example.com/x"))
+            for _ in range(2)
+        ]
+        await _settle()
+        for caller in callers:
+            caller.cancel()
+        release.set()
+        await blocker
+        await _settle()
+        return shortener.calls, scheduler.stats()["queued"]
+
+    calls, queued = asyncio.run(main())
+    assert calls == ["https://example.com/blocker"]
+    assert queued == {INTERACTIVE: 0, BULK: 0}
+
+
+def test_failure_reaches_every_caller(make_shortener):
+    async def main():
+        shortener = make_shortener()
+        shortener.failures.add("https://example.com/bad")
+        scheduler = Scheduler()
+        return await asyncio.gather(
+            *(scheduler.submit(shortener, "https://example.com/bad") for _ in range(3)),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, Exception) for result in results)
+
+
+def test_scheduler_is_bound_to_one_event_loop(make_shortener):
+    scheduler = Scheduler()
+    shortener = make_shortener()
+    asyncio.run(scheduler.submit(shortener, "https://example.com/1"))
+    with pytest.raises(RuntimeError):
+        asyncio.run(scheduler.submit(shortener, "https://example.com/2"))
+
+
+def test_convert_goes_through_the_scheduler(make_shortener):
+    async def main():
+        scheduler = Scheduler()
+        shortener = make_shortener(scheduler=scheduler)
+        await shortener.convert("https://example.com/1")
+        await shortener.bulk_convert(["https://example.com/2", "https://example.com/3"])
+        return scheduler.stats()["wait"]
+
+    wait = asyncio.run(main())
+    assert wait[INTERACTIVE]["count"] == 1
+    assert wait[BULK]["count"] == 2
+
+
+def test_cache_is_looked_up_once_per_call(make_shortener):
+    async def main():
+        shortener = make_shortener(cache=True, scheduler=Scheduler())
+        await shortener.convert("https://example.com/1")
+        await shortener.convert("https://example.com/1")
+        return shortener.cache.stats()
+
+    stats = asyncio.run(main())
+    assert stats["misses"] == 1
+    assert stats["hits"] == 1
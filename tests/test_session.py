@@ -0,0 +1,39 @@
+import asyncio
+import gc
+import logging
+import warnings
+
+from shortzy import Shortzy
+
+
+def _check_nothing_left_open(caplog, caught):
+    gc.collect()
+    assert not [w for w in caught if issubclass(w.category, ResourceWarning)]
+    assert "Unclosed" not in caplog.text
+
+
+def test_reuse_across_event_loops_closes_each_session(api_server, caplog):
+    shortzy = Shortzy("key", base_site="short.test")
+    shortzy.shortener.base_url = api_server.url
+
+    with warnings.catch_warnings(record=True) as caught, caplog.at_level(logging.DEBUG):
+        warnings.simplefilter("always")
+        first = asyncio.run(shortzy.convert("https://example.com/1"))
+        second = asyncio.run(shortzy.convert("https://example.com/2"))
+        asyncio.run(shortzy.close())
+        _check_nothing_left_open(caplog, caught)
+
+    assert (first, second) == ("https://short.test/1", "https://short.test/2")
+
+
+def test_unclosed_shortener_is_cleaned_up_with_its_loop(api_server, caplog):
+    async def convert(link):
+        shortzy = Shortzy("key", base_site="short.test")
+        shortzy.shortener.base_url = api_server.url
+        return await shortzy.convert(link)
+
+    with warnings.catch_warnings(record=True) as caught, caplog.at_level(logging.DEBUG):
+        warnings.simplefilter("always")
+        for i in range(3):
+            assert asyncio.run(convert(f"https://example.com/{i}")) == f"https://short.test/{i}"
+        _check_nothing_left_open(caplog, caught)
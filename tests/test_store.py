@@ -0,0 +1,93 @@
+import asyncio
+
+from shortzy.store import LinkStore
+
+
+def test_links_are_read_back_before_and_after_commit(tmp_path):
+    async def main():
+        store = LinkStore(str(tmp_path / "links.db"))
+        store.put("example.com", "key", "https://a.test", "", "https://example.com/a")
+        pending = await store.get("example.com", "key", "https://a.test")
+        await store.flush()
+        committed = await store.get("example.com", "key", "https://a.test")
+        await store.close()
+
+        reopened = LinkStore(str(tmp_path / "links.db"))
+        persisted = await reopened.get("example.com", "key", "https://a.test")
+        await reopened.close()
+        return pending, committed, persisted
+
+    assert asyncio.run(main()) == ("https://example.com/a",) * 3
+
+
+def test_links_are_kept_per_account_and_alias(tmp_path):
+    async def main():
+        store = LinkStore(str(tmp_path / "links.db"))
+        store.put("example.com", "key-a", "https://a.test", "", "https://example.com/a")
+        await store.flush()
+        other_account = await store.get("example.com", "key-b", "https://a.test")
+        other_alias = await store.get("example.com", "key-a", "https://a.test", "alias")
+        other_site = await store.get("other.com", "key-a", "https://a.test")
+        await store.close()
+        return other_account, other_alias, other_site
+
+    assert asyncio.run(main()) == (None, None, None)
+
+
+def test_writes_are_committed_in_batches(tmp_path):
+    async def main():
+        store = LinkStore(str(tmp_path / "links.db"), batch_size=500, flush_interval=1)
+        for i in range(1200):
+            store.put("example.com", "key", f"https://{i}.test", "", f"https://example.com/{i}")
+        await store.flush()
+        found = await store.get_many(
+            "example.com", "key", [f"https://{i}.test" for i in range(1300)]
+        )
+        stats = store.stats()
+        await store.close()
+        return len(found), stats
+
+    found, stats = asyncio.run(main())
+    assert found == 1200
+    assert stats["writes"] == 1200
+    assert stats["batches"] == 3
+    assert stats["pending"] == 0
+    assert stats["hits"] == 1200
+    assert stats["misses"] == 100
+
+
+def test_expired_links_are_ignored_and_compacted(tmp_path):
+    async def main():
+        store = LinkStore(str(tmp_path / "links.db"), ttl=0.05)
+        store.put("example.com", "key", "https://a.test", "", "https://example.com/a")
+        await store.flush()
+        fresh = await store.get("example.com", "key", "https://a.test")
+        await asyncio.sleep(0.1)
+        expired = await store.get("example.com", "key", "https://a.test")
+        deleted = await store.compact()
+        await store.close()
+        return fresh, expired, deleted
+
+    assert asyncio.run(main()) == ("https://example.com/a", None, 1)
+
+
+def test_shortener_looks_a_batch_up_once(tmp_path, make_shortener):
+    async def main():
+        store = LinkStore(str(tmp_path / "links.db"))
+        links = [f"https://{i}.test" for i in range(20)]
+
+        first = make_shortener(store=store)
+        await first.bulk_convert(links)
+        await first.close()
+        cold = store.stats()
+
+        second = make_shortener(store=store)
+        again = await second.bulk_convert(links)
+        await second.close()
+        await store.close()
+        return cold, second.calls, again
+
+    cold, calls, again = asyncio.run(main())
+    assert cold["misses"] == 20
+    assert calls == []
+    assert all(link.startswith("https://short.test/") for link in again)
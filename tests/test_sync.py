@@ -0,0 +1,65 @@
+import concurrent.futures
+import threading
+import time
+
+import pytest
+
+from shortzy import SyncShortzy, register_provider
+
+
+@pytest.fixture
+def sync_shortzy(make_shortener):
+    register_provider("sync.test", make_shortener, listed=False)
+    shortzy = SyncShortzy("key", base_site="sync.test")
+    yield shortzy
+    shortzy.close()
+
+
+def test_calls_from_many_threads_share_one_loop(sync_shortzy):
+    links = [f"https://example.com/{i}" for i in range(40)]
+    with concurrent.futures.ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(sync_shortzy.convert, links))
+    assert all(result.startswith("https://short.test/") for result in results)
+    assert len(sync_shortzy.bulk_convert(links[:3])) == 3
+
+
+def test_timeout_cancels_the_call(sync_shortzy):
+    shortener = sync_shortzy.shortzy.shortener
+    shortener.delay = 5
+    with pytest.raises(concurrent.futures.TimeoutError):
+        sync_shortzy.convert("https://example.com/slow", timeout=0.05)
+    shortener.delay = 0
+    for _ in range(100):
+        if sync_shortzy.stats()["inflight_requests"] == 0:
+            break
+        time.sleep(0.01)
+    assert sync_shortzy.stats()["inflight_requests"] == 0
+
+
+def test_close_finishes_pending_calls(make_shortener):
+    register_provider("sync.test", make_shortener, listed=False)
+    shortzy = SyncShortzy("key", base_site="sync.test")
+    shortzy.shortzy.shortener.delay = 0.05
+    future = shortzy.submit_convert("https://example.com/1")
+    shortzy.close()
+    assert future.result(0).startswith("https://short.test/")
+
+
+def test_close_cancels_calls_past_the_timeout(make_shortener):
+    register_provider("sync.test", make_shortener, listed=False)
+    shortzy = SyncShortzy("key", base_site="sync.test")
+    shortzy.shortzy.shortener.delay = 5
+    future = shortzy.submit_convert("https://example.com/1")
+    shortzy.close(timeout=0.05)
+    assert future.cancelled()
+
+
+def test_calls_after_close_are_refused(make_shortener):
+    register_provider("sync.test", make_shortener, listed=False)
+    shortzy = SyncShortzy("key", base_site="sync.test")
+    shortzy.close()
+    with pytest.raises(RuntimeError):
+        shortzy.convert("https://example.com/1")
+    assert not any(thread.name == "shortzy-event-loop" and thread.is_alive()
+                   for thread in threading.enumerate()
+                   if thread is shortzy._thread)